@@ -0,0 +1,138 @@
+import asyncio
+from playwright.async_api import async_playwright
+import argparse
+import logging
+import time
+
+from get_all_colleges import launch_browser, crawl_college, extract_college_name, make_rate_limiter
+from metrics import METRICS
+
+def read_base_urls(path):
+    """Read one base URL per line, ignoring blank lines, comments and duplicates"""
+    urls = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            url = line.strip()
+            if not url or url.startswith("#") or url in seen:
+                continue
+            seen.add(url)
+            urls.append(url)
+    return urls
+
+async def batch_scrape(base_urls, out_folder, headless=True, proxy=None, max_pages=50,
+                       delay_min=1, delay_max=3, workers=1, parallel_colleges=2,
+                       prioritize=False, resume=False, incremental=False, fast=False, http_fallback=False,
+                       output_format="json", adaptive_rate=False, min_rate=0.1, max_rate=5.0, max_retries=3):
+    """Crawl many colleges with one shared browser and a bounded number of contexts"""
+    # All colleges live on the same host, so they share one limiter
+    rate_limiter = None
+    if adaptive_rate:
+        rate_limiter = make_rate_limiter(workers * max(1, parallel_colleges), delay_min, delay_max, min_rate, max_rate)
+    jobs = asyncio.Queue()
+    for index, url in enumerate(base_urls, start=1):
+        jobs.put_nowait((index, url))
+
+    total = len(base_urls)
+    results = []
+
+    async with async_playwright() as p:
+        browser = await launch_browser(p, headless=headless, proxy=proxy)
+
+        async def college_worker():
+            # Each worker owns at most one browser context at a time
+            while True:
+                try:
+                    index, url = jobs.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                college_name = extract_college_name(url)
+                print(f"▶️  [{index}/{total}] Starting {college_name}")
+                started = time.monotonic()
+                try:
+                    pages = await crawl_college(
+                        browser, url, out_folder,
+                        max_pages=max_pages, delay_min=delay_min, delay_max=delay_max, workers=workers,
+                        prioritize=prioritize, resume=resume, incremental=incremental,
+                        fast=fast, http_fallback=http_fallback, output_format=output_format,
+                        rate_limiter=rate_limiter, max_retries=max_retries
+                    )
+                    elapsed = time.monotonic() - started
+                    METRICS.observe("crawl_college", elapsed)
+                    METRICS.incr("colleges_done")
+                    results.append((url, college_name, pages, None))
+                    print(f"✅ [{index}/{total}] {college_name}: {pages} pages in {elapsed:.0f}s "
+                          f"({len(results)}/{total} colleges done)")
+                except Exception as e:
+                    METRICS.incr("colleges_failed")
+                    results.append((url, college_name, 0, e))
+                    print(f"❌ [{index}/{total}] {college_name} failed: {e}")
+
+        parallel_colleges = max(1, min(parallel_colleges, total))
+        await asyncio.gather(*(college_worker() for _ in range(parallel_colleges)))
+        await browser.close()
+
+    failed = [r for r in results if r[3] is not None]
+    pages = sum(r[2] for r in results)
+    print(f"\nBatch finished: {len(results) - len(failed)} colleges succeeded, "
+          f"{len(failed)} failed, {pages} pages scraped")
+    for url, college_name, _, error in failed:
+        print(f"   {college_name} ({url}): {error}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", required=True, help="File with one college base URL per line")
+    parser.add_argument("--out", default="scraped_data", help="Output folder for college data")
+    parser.add_argument("--headless", default=True, type=bool, help="Run headless or not")
+    parser.add_argument("--proxy", default=None, help="Proxy server (http://user:pass@ip:port)")
+    parser.add_argument("--max-pages", default=50, type=int, help="Maximum pages to scrape per college")
+    parser.add_argument("--delay-min", default=1, type=float, help="Minimum delay between requests")
+    parser.add_argument("--delay-max", default=3, type=float, help="Maximum delay between requests")
+    parser.add_argument("--workers", default=1, type=int, help="Concurrent pages per college")
+    parser.add_argument("--prioritize", action="store_true", help="Crawl admission, cutoff, fees and placement pages first")
+    parser.add_argument("--resume", action="store_true", help="Continue each unfinished college crawl from its checkpoint file")
+    parser.add_argument("--incremental", action="store_true", help="Skip pages that are unchanged since the last crawl")
+    parser.add_argument("--fast", action="store_true", help="Block images/fonts/media/trackers and wait for content instead of fixed delays")
+    parser.add_argument("--http-fallback", action="store_true", help="Use a plain HTTP fetch for pages that do not need JS rendering")
+    parser.add_argument("--format", default="json", choices=["json", "jsonl"],
+                        help="json: one file per page; jsonl: one compressed archive per college")
+    parser.add_argument("--parallel-colleges", default=2, type=int, help="Colleges crawled at the same time")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="DEBUG also shows discovered links and saved files")
+    parser.add_argument("--metrics-out", default=None,
+                        help="Write crawl metrics to this file (Prometheus text for *.prom, JSON otherwise)")
+    parser.add_argument("--adaptive-rate", action="store_true",
+                        help="Pace requests per host, speeding up on healthy responses and backing off on 429/5xx/timeouts")
+    parser.add_argument("--min-rate", default=0.1, type=float, help="Lowest request rate per host (pages/s) with --adaptive-rate")
+    parser.add_argument("--max-rate", default=5.0, type=float, help="Highest request rate per host (pages/s) with --adaptive-rate")
+    parser.add_argument("--max-retries", default=3, type=int, help="Retries per failed page before it goes to the dead-letter report")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(message)s")
+
+    asyncio.run(batch_scrape(
+        base_urls=read_base_urls(args.urls),
+        out_folder=args.out,
+        headless=args.headless,
+        proxy=args.proxy,
+        max_pages=args.max_pages,
+        delay_min=args.delay_min,
+        delay_max=args.delay_max,
+        workers=args.workers,
+        parallel_colleges=args.parallel_colleges,
+        prioritize=args.prioritize,
+        resume=args.resume,
+        incremental=args.incremental,
+        fast=args.fast,
+        http_fallback=args.http_fallback,
+        output_format=args.format,
+        adaptive_rate=args.adaptive_rate,
+        min_rate=args.min_rate,
+        max_rate=args.max_rate,
+        max_retries=args.max_retries
+    ))
+    print(METRICS.summary())
+    if args.metrics_out:
+        METRICS.write(args.metrics_out)
@@ -0,0 +1,350 @@
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import importlib.util
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from benchmark_fixtures import FixtureSite, InMemoryFirestore, generate_corpus, serve_fixture_site
+from dedup import BoilerplateFilter, simhash
+from document_sources import FirestoreSource, normalize_document
+from html_extract import extract_page
+from metrics import METRICS
+
+STAGES = ["clean", "dedup", "chunk", "parse", "upload", "upload_incremental", "fetch", "embed", "vectorize", "crawl"]
+# Optional packages a stage needs; the stage is skipped when one is missing
+REQUIRES = {
+    # Chunking is measured with the model's tokenizer, as the vectorizer runs it
+    "chunk": ["transformers"],
+    "embed": ["sentence_transformers"],
+    "vectorize": ["sentence_transformers", "chromadb"],
+    "crawl": ["playwright"],
+}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def result(items: int, seconds: float, latencies: Optional[List[float]] = None, unit: str = "items") -> Dict[str, Any]:
+    """Throughput plus per-item latency percentiles (milliseconds) for one stage.
+
+    Whole-pipeline stages pass no latencies and attach their METRICS timers instead.
+    """
+    stats: Dict[str, Any] = {
+        "items": items,
+        "unit": unit,
+        "seconds": round(seconds, 4),
+        "throughput": round(items / seconds, 2) if seconds > 0 else 0.0,
+    }
+    if latencies:
+        stats["p50_ms"] = round(percentile(latencies, 0.5) * 1000, 3)
+        stats["p95_ms"] = round(percentile(latencies, 0.95) * 1000, 3)
+        stats["max_ms"] = round(max(latencies) * 1000, 3)
+    return stats
+
+
+def timed_each(items: Iterable[Any], fn: Callable[[Any], int], unit: str) -> Dict[str, Any]:
+    """Run fn over items, timing each call; fn returns how many output units it produced"""
+    latencies: List[float] = []
+    produced = 0
+    started = time.perf_counter()
+    for item in items:
+        t = time.perf_counter()
+        produced += fn(item)
+        latencies.append(time.perf_counter() - t)
+    return result(produced, time.perf_counter() - started, latencies, unit)
+
+
+def corpus_files(corpus: str) -> List[str]:
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(corpus)
+        for name in names if name.endswith(".json")
+    )
+
+
+def load_raw(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Benchmark:
+    """Runs pipeline stages against a synthetic corpus and reports per-stage numbers."""
+
+    def __init__(self, args: argparse.Namespace, work_dir: str) -> None:
+        self.args = args
+        self.work_dir = work_dir
+        self.corpus = os.path.join(work_dir, "scraped_data")
+        self.files = corpus_files(self.corpus)
+        self.raw = [load_raw(path) for path in self.files]
+        self.firestore = InMemoryFirestore(latency=args.firestore_latency_ms / 1000)
+
+    def stage_clean(self) -> Dict[str, Any]:
+        def clean(data: Dict[str, Any]) -> int:
+            normalize_document("page.json", dict(data))
+            return 1
+
+        return timed_each(self.raw, clean, "docs")
+
+    def stage_dedup(self) -> Dict[str, Any]:
+        def fingerprint(data: Dict[str, Any]) -> int:
+            simhash(boilerplate.strip(data["content"]))
+            return 1
+
+        # One boilerplate model over the whole corpus; the loader builds one per college
+        boilerplate = BoilerplateFilter()
+        for data in self.raw:
+            boilerplate.observe(data["content"])
+        return timed_each(self.raw, fingerprint, "docs")
+
+    def stage_chunk(self) -> Dict[str, Any]:
+        vectorizer = self._vectorizer(os.path.join(self.work_dir, "chroma_chunk"))
+        try:
+            vectorizer.chunker  # Load the tokenizer outside the timed region
+            texts = [normalize_document("page.json", dict(data))[1]["content"] for data in self.raw]
+            return timed_each(texts, lambda text: len(vectorizer.chunk_text(text)), "chunks")
+        finally:
+            vectorizer.close()
+
+    def stage_parse(self) -> Dict[str, Any]:
+        site = FixtureSite(self.args.pages, self.args.words, self.args.seed)
+        pages = [site.html(path, "http://127.0.0.1") for path in site.pages]
+
+        def parse(html: str) -> int:
+            extract_page(html, "http://127.0.0.1/")
+            return 1
+
+        return timed_each(pages, parse, "pages")
+
+    def _upload(self, incremental: bool) -> Dict[str, Any]:
+        from save_colleges_to_db import FirestoreLoader
+        loader = FirestoreLoader(db=self.firestore)
+        METRICS.reset()
+        before = self.firestore.round_trips
+        started = time.perf_counter()
+        loader.process_base_folder(
+            self.corpus,
+            incremental=incremental,
+            batch_size=self.args.batch_size,
+            max_workers=self.args.upload_workers,
+            dedup=self.args.dedup
+        )
+        stats = result(len(self.files), time.perf_counter() - started, unit="docs")
+        stats["round_trips"] = self.firestore.round_trips - before
+        stats["timers"] = METRICS.snapshot()["timers"]
+        return stats
+
+    def stage_upload(self) -> Dict[str, Any]:
+        return self._upload(incremental=False)
+
+    def stage_upload_incremental(self) -> Dict[str, Any]:
+        # Nothing changed since the previous stage, so this measures the skip path
+        return self._upload(incremental=True)
+
+    def firestore_source(self) -> FirestoreSource:
+        """Source over the in-memory Firestore, filled by the upload stage if it has not run"""
+        if not self.firestore.docs:
+            self._upload(incremental=False)
+        return FirestoreSource(page_size=self.args.page_size, client=self.firestore)
+
+    def stage_fetch(self) -> Dict[str, Any]:
+        source = self.firestore_source()
+        before = self.firestore.round_trips
+        started = time.perf_counter()
+        docs = sum(1 for college in source.list_colleges() for _ in source.iter_documents(college))
+        stats = result(docs, time.perf_counter() - started, unit="docs")
+        stats["round_trips"] = self.firestore.round_trips - before
+        return stats
+
+    def _vectorizer(self, persist_dir: str, source: Optional[FirestoreSource] = None) -> Any:
+        from firestore_to_vectordb import FirestoreToVectorDB
+        return FirestoreToVectorDB(
+            persist_dir=persist_dir,
+            embed_batch_size=self.args.embed_batch_size,
+            max_chunk_tokens=self.args.max_chunk_tokens,
+            embed_workers=self.args.embed_workers,
+            source=source,
+            dedup=self.args.dedup
+        )
+
+    def stage_embed(self) -> Dict[str, Any]:
+        vectorizer = self._vectorizer(os.path.join(self.work_dir, "chroma_embed"))
+        try:
+            chunks = [
+                chunk for data in self.raw
+                for chunk in vectorizer.chunk_text(normalize_document("page.json", dict(data))[1]["content"])
+            ]
+            batch = self.args.embed_batch_size
+            batches = [chunks[i:i + batch] for i in range(0, len(chunks), batch)]
+            vectorizer.encode(batches[0][:1])  # Load the model outside the timed region
+            return timed_each(batches, lambda texts: len(vectorizer.encode(texts)), "chunks")
+        finally:
+            vectorizer.close()
+
+    def stage_vectorize(self) -> Dict[str, Any]:
+        vectorizer = self._vectorizer(os.path.join(self.work_dir, "chroma_db"), self.firestore_source())
+        try:
+            vectorizer.embedding_model, vectorizer.chunker  # Load model and tokenizer outside the timed region
+            METRICS.reset()
+            started = time.perf_counter()
+            vectorizer.run()
+            stats = result(vectorizer.total_chunks_written, time.perf_counter() - started, unit="chunks")
+            stats["timers"] = METRICS.snapshot()["timers"]
+            return stats
+        finally:
+            vectorizer.close()
+
+    def stage_crawl(self) -> Dict[str, Any]:
+        from playwright.async_api import async_playwright
+        from get_all_colleges import crawl_college, launch_browser
+
+        site = FixtureSite(self.args.crawl_pages, self.args.words, self.args.seed)
+        server, base_url = serve_fixture_site(site)
+        out_folder = os.path.join(self.work_dir, "crawl")
+
+        async def crawl() -> int:
+            async with async_playwright() as p:
+                browser = await launch_browser(p)
+                try:
+                    return await crawl_college(
+                        browser, base_url, out_folder, max_pages=len(site.pages),
+                        delay_min=0, delay_max=0, workers=self.args.crawl_workers,
+                        fast=True, http_fallback=self.args.http_fallback
+                    )
+                finally:
+                    await browser.close()
+
+        try:
+            METRICS.reset()
+            started = time.perf_counter()
+            pages = asyncio.run(crawl())
+            stats = result(pages, time.perf_counter() - started, unit="pages")
+            stats["timers"] = METRICS.snapshot()["timers"]
+            return stats
+        finally:
+            server.shutdown()
+
+    def run(self, stages: List[str]) -> Dict[str, Dict[str, Any]]:
+        results: Dict[str, Dict[str, Any]] = {}
+        for stage in stages:
+            missing = [name for name in REQUIRES.get(stage, []) if importlib.util.find_spec(name) is None]
+            if missing:
+                results[stage] = {"skipped": f"missing {', '.join(missing)}"}
+                continue
+            try:
+                results[stage] = getattr(self, f"stage_{stage}")()
+            except Exception as e:
+                # Not a skip: a crashing stage must fail a --baseline comparison
+                results[stage] = {"error": f"{type(e).__name__}: {e}"}
+        return results
+
+
+def print_report(results: Dict[str, Dict[str, Any]]) -> None:
+    def ms(stats: Dict[str, Any], key: str) -> str:
+        return f"{stats[key]:>10.2f}" if key in stats else f"{'-':>10}"
+
+    print(f"{'stage':<20}{'items':>8}{'unit':>8}{'seconds':>10}{'per sec':>11}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for stage, stats in results.items():
+        if "skipped" in stats:
+            print(f"{stage:<20}skipped ({stats['skipped']})")
+            continue
+        if "error" in stats:
+            print(f"{stage:<20}FAILED ({stats['error']})")
+            continue
+        line = (
+            f"{stage:<20}{stats['items']:>8}{stats['unit']:>8}{stats['seconds']:>10.3f}{stats['throughput']:>11.1f}"
+            f"{ms(stats, 'p50_ms')}{ms(stats, 'p95_ms')}{ms(stats, 'max_ms')}"
+        )
+        if "round_trips" in stats:
+            line += f"  {stats['round_trips']} round trips"
+        print(line)
+        for name, timer in sorted(stats.get("timers", {}).items()):
+            print(f"    {name:<28}{timer['count']:>6} x avg {timer['avg'] * 1000:.2f} ms, max {timer['max'] * 1000:.2f} ms")
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+    stages: Optional[List[str]] = None
+) -> List[str]:
+    """Stages that failed, vanished, or whose throughput fell more than ``tolerance`` below the baseline.
+
+    Only stages skipped for a missing optional package are exempt. ``stages`` limits the
+    check to the stages that were asked for (default: all of the baseline's).
+    """
+    regressions = []
+    for stage, before in baseline.items():
+        if stages is not None and stage not in stages:
+            continue
+        stats = results.get(stage)
+        if stats is None:
+            if before.get("throughput"):
+                regressions.append(f"{stage}: in the baseline but not run")
+            continue
+        if "error" in stats:
+            regressions.append(f"{stage}: failed ({stats['error']})")
+            continue
+        if "throughput" not in stats or not before.get("throughput"):
+            continue
+        change = stats["throughput"] / before["throughput"] - 1
+        if change < -tolerance:
+            regressions.append(
+                f"{stage}: {before['throughput']} -> {stats['throughput']} {stats['unit']}/s ({change:+.0%})"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the scrape-to-vector pipeline")
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES, help="Stages to run, in order")
+    parser.add_argument("--colleges", default=3, type=int, help="Synthetic colleges in the corpus")
+    parser.add_argument("--pages", default=60, type=int, help="Pages per synthetic college")
+    parser.add_argument("--words", default=600, type=int, help="Approximate words of body text per page")
+    parser.add_argument("--seed", default=0, type=int, help="Corpus seed; same seed, same corpus")
+    parser.add_argument("--work-dir", default=None, help="Keep corpus and outputs here (default: temp dir, removed)")
+    parser.add_argument("--firestore-latency-ms", default=0, type=float, help="Simulated latency per Firestore round trip")
+    parser.add_argument("--batch-size", default=500, type=int, help="Upload batch size")
+    parser.add_argument("--upload-workers", default=8, type=int, help="Concurrent upload batches")
+    parser.add_argument("--page-size", default=300, type=int, help="Firestore page size for the fetch stage")
+    parser.add_argument("--max-chunk-tokens", default=254, type=int, help="Chunk size in tokens")
+    parser.add_argument("--embed-batch-size", default=64, type=int, help="Texts per encode() call")
+    parser.add_argument("--embed-workers", default=0, type=int, help="Embedding processes for the vectorize stage")
+    parser.add_argument("--dedup", action="store_true", help="Enable near-duplicate filtering in upload/vectorize")
+    parser.add_argument("--crawl-pages", default=30, type=int, help="Pages on the local fixture site")
+    parser.add_argument("--crawl-workers", default=4, type=int, help="Concurrent crawler pages")
+    parser.add_argument("--http-fallback", action="store_true", help="Crawl with plain HTTP fetches where possible")
+    parser.add_argument("--json-out", default=None, help="Write results as JSON (usable as a --baseline later)")
+    parser.add_argument("--baseline", default=None, help="Earlier --json-out file to compare throughput against")
+    parser.add_argument("--tolerance", default=0.2, type=float, help="Allowed throughput drop vs baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="procounsel-bench-")
+    try:
+        corpus = os.path.join(work_dir, "scraped_data")
+        if not os.path.isdir(corpus):
+            count = generate_corpus(corpus, args.colleges, args.pages, args.words, args.seed)
+            print(f"Generated {count} pages in {corpus}")
+        results = Benchmark(args, work_dir).run(args.stages)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_report(results)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.stages)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,325 @@
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Tabs of a collegedunia university page; names hit the crawler's category rules
+TABS = [
+    "", "admission", "courses-fees", "cutoff", "placement", "hostel", "scholarship",
+    "faculty", "infrastructure", "ranking", "reviews", "gallery", "btech-course"
+]
+NAV_LINES = ["Home", "Colleges", "Exams", "Courses", "News", "Login / Register", "Write a Review"]
+FOOTER_LINES = [
+    "About Us | Contact Us | Careers | Privacy Policy | Terms & Conditions",
+    "Copyright 2024 Collegedunia Web Pvt. Ltd. All rights reserved."
+]
+PROMO = "Get Upto 50% off on application fees for top colleges. Apply now and Explore"
+WORDS = (
+    "admission eligibility entrance exam counselling seat matrix cutoff rank round fees tuition "
+    "hostel mess scholarship merit placement package recruiter average highest median campus "
+    "library laboratory faculty professor department research intake branch semester credit "
+    "course degree program engineering management science commerce law design pharmacy quota "
+    "category general reserved state national deadline document verification interview result"
+).split()
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraphs(rng: random.Random, words: int) -> List[str]:
+    paragraphs = []
+    count = 0
+    while count < words:
+        sentences = [_sentence(rng) for _ in range(rng.randint(2, 6))]
+        paragraphs.append(" ".join(sentences))
+        count += sum(len(s.split()) for s in sentences)
+    return paragraphs
+
+
+def college_slug(index: int) -> Tuple[str, str]:
+    """(university path part, folder name) for the index-th synthetic college"""
+    slug = f"synthetic-institute-of-technology-{index}"
+    return f"{90000 + index}-{slug}", slug.replace("-", "_")
+
+
+def synthetic_pages(
+    college_index: int,
+    pages: int,
+    words: int,
+    seed: int = 0,
+    duplicate_ratio: float = 0.1
+) -> Iterator[Tuple[str, str, str]]:
+    """(tab path, title, raw text) for one college, shaped like render_page() output.
+
+    Every page carries the same nav/promo/footer lines, and about ``duplicate_ratio``
+    of the pages repeat an earlier page's body with a single sentence changed.
+    """
+    rng = random.Random(f"{seed}:{college_index}")
+    bodies: List[List[str]] = []
+    for i in range(pages):
+        tab = TABS[i % len(TABS)]
+        path = tab if i < len(TABS) else f"{tab or 'news'}-{i}"
+        if bodies and rng.random() < duplicate_ratio:
+            body = list(rng.choice(bodies))
+            body[rng.randrange(len(body))] = _sentence(rng)
+        else:
+            body = _paragraphs(rng, words)
+            bodies.append(body)
+        title = f"Synthetic Institute {college_index} {path or 'overview'}"
+        text = "\n".join(NAV_LINES + [title, PROMO] + body + FOOTER_LINES)
+        yield path, title, text
+
+
+def generate_corpus(
+    out_folder: str,
+    colleges: int = 3,
+    pages: int = 50,
+    words: int = 600,
+    seed: int = 0,
+    duplicate_ratio: float = 0.1
+) -> int:
+    """Write a ``<out>/<college>/*.json`` corpus in the crawler's output shape. Returns file count."""
+    written = 0
+    for c in range(colleges):
+        university, folder = college_slug(c)
+        college_folder = os.path.join(out_folder, folder)
+        os.makedirs(college_folder, exist_ok=True)
+        for path, title, text in synthetic_pages(c, pages, words, seed, duplicate_ratio):
+            name = path.replace("-", "_") or "main"
+            page_data = {
+                "url": f"https://collegedunia.com/university/{university}/{path}".rstrip("/"),
+                "title": title,
+                "content": text,
+                "category": path.split("-")[0] or "profile",
+                "content_hash": hashlib.sha256(f"{title}\n{text}".encode("utf-8")).hexdigest(),
+                "scraped_at": "2024-01-01 00:00:00"
+            }
+            with open(os.path.join(college_folder, f"{name}.json"), "w", encoding="utf-8") as f:
+                json.dump(page_data, f, indent=2, ensure_ascii=False)
+            written += 1
+    return written
+
+
+def render_html(title: str, text: str, links: List[str]) -> str:
+    lines = text.split("\n")
+    anchors = "".join(f'<li><a href="{link}">{link.rsplit("/", 1)[-1] or "home"}</a></li>' for link in links)
+    body = "".join(f"<p>{line}</p>" for line in lines)
+    return (
+        f"<!DOCTYPE html><html><head><title>{title}</title>"
+        f'<script src="/static/app.js"></script><style>p{{margin:0}}</style></head>'
+        f"<body><nav><ul>{anchors}</ul></nav><main>{body}</main></body></html>"
+    )
+
+
+class FixtureSite:
+    """A synthetic collegedunia university served from memory.
+
+    The crawler only follows links containing "collegedunia.com" with the same
+    /university/<id>- part, so pages live under ``/collegedunia.com/university/...``
+    on the local server.
+    """
+
+    def __init__(self, pages: int = 40, words: int = 600, seed: int = 0, college_index: int = 0) -> None:
+        self.university, _ = college_slug(college_index)
+        self.prefix = f"/collegedunia.com/university/{self.university}"
+        self.pages: Dict[str, Tuple[str, str]] = {}
+        for path, title, text in synthetic_pages(college_index, pages, words, seed):
+            self.pages[f"{self.prefix}/{path}".rstrip("/")] = (title, text)
+
+    def html(self, path: str, origin: str) -> Optional[str]:
+        page = self.pages.get(path.rstrip("/"))
+        if page is None:
+            return None
+        # Every page links to a handful of siblings plus an off-site link the crawler must ignore
+        paths = sorted(self.pages)
+        start = paths.index(path.rstrip("/"))
+        siblings = [paths[(start + step) % len(paths)] for step in (1, 2, 3, 5, 8)]
+        links = [origin + p for p in siblings] + ["https://example.com/elsewhere"]
+        return render_html(page[0], page[1], links)
+
+
+def serve_fixture_site(site: FixtureSite, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start serving ``site`` on a background thread; returns (server, base URL of the university)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            origin = f"http://{host}:{self.server.server_address[1]}"
+            body = site.html(self.path.split("?")[0], origin)
+            if body is None:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            etag = '"' + hashlib.sha256(data).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="fixture-site", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}{site.prefix}"
+
+
+class InMemorySnapshot:
+    def __init__(self, reference: "InMemoryDocument", data: Optional[Dict[str, Any]]) -> None:
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return dict(self._data) if self._data is not None else None
+
+
+class InMemoryDocument:
+    def __init__(self, store: "InMemoryFirestore", path: str) -> None:
+        self.store = store
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def collection(self, name: str) -> "InMemoryCollection":
+        return InMemoryCollection(self.store, f"{self.path}/{name}")
+
+    def get(self, field_paths: Optional[List[str]] = None) -> InMemorySnapshot:
+        self.store.round_trip()
+        return InMemorySnapshot(self, self.store.read(self.path, field_paths))
+
+    def set(self, data: Dict[str, Any]) -> None:
+        self.store.round_trip()
+        self.store.write(self.path, data)
+
+
+class InMemoryQuery:
+    def __init__(self, collection: "InMemoryCollection", limit: Optional[int] = None, after: Optional[str] = None) -> None:
+        self.collection = collection
+        self._limit = limit
+        self._after = after
+
+    def limit(self, count: int) -> "InMemoryQuery":
+        return InMemoryQuery(self.collection, count, self._after)
+
+    def start_after(self, snapshot: InMemorySnapshot) -> "InMemoryQuery":
+        return InMemoryQuery(self.collection, self._limit, snapshot.id)
+
+    def stream(self) -> Iterator[InMemorySnapshot]:
+        self.collection.store.round_trip()
+        ids = self.collection.child_ids()
+        if self._after is not None:
+            ids = [doc_id for doc_id in ids if doc_id > self._after]
+        if self._limit is not None:
+            ids = ids[:self._limit]
+        for doc_id in ids:
+            ref = self.collection.document(doc_id)
+            yield InMemorySnapshot(ref, self.collection.store.read(ref.path))
+
+
+class InMemoryCollection:
+    def __init__(self, store: "InMemoryFirestore", path: str) -> None:
+        self.store = store
+        self.path = path
+
+    def document(self, doc_id: str) -> InMemoryDocument:
+        return InMemoryDocument(self.store, f"{self.path}/{doc_id}")
+
+    def child_ids(self, include_parents: bool = False) -> List[str]:
+        """IDs of documents stored directly in this collection (optionally also
+        documents that only exist as parents of subcollections)"""
+        prefix = self.path + "/"
+        ids = set()
+        with self.store.lock:
+            for path in self.store.docs:
+                if not path.startswith(prefix):
+                    continue
+                rest = path[len(prefix):]
+                if "/" not in rest:
+                    ids.add(rest)
+                elif include_parents:
+                    ids.add(rest.split("/", 1)[0])
+        return sorted(ids)
+
+    def list_documents(self, page_size: Optional[int] = None) -> Iterator[InMemoryDocument]:
+        ids = self.child_ids(include_parents=True)
+        step = page_size or len(ids) or 1
+        for start in range(0, len(ids), step):
+            self.store.round_trip()
+            for doc_id in ids[start:start + step]:
+                yield self.document(doc_id)
+
+    def order_by(self, field: str) -> InMemoryQuery:
+        # Only document-ID ordering is used by the pipeline
+        return InMemoryQuery(self)
+
+
+class InMemoryWriteBatch:
+    def __init__(self, store: "InMemoryFirestore") -> None:
+        self.store = store
+        self.writes: List[Tuple[str, Dict[str, Any]]] = []
+
+    def set(self, ref: InMemoryDocument, data: Dict[str, Any]) -> None:
+        self.writes.append((ref.path, data))
+
+    def commit(self) -> None:
+        self.store.round_trip()
+        for path, data in self.writes:
+            self.store.write(path, data)
+
+
+class InMemoryFirestore:
+    """Stand-in for ``firestore.Client`` covering the calls made by this repo.
+
+    Every network call (get, set, get_all, batch commit, query page, list page)
+    counts as one round trip and sleeps ``latency`` seconds, so batching and
+    concurrency changes show up in benchmarks the way they would against Firestore.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.round_trips = 0
+        self.lock = threading.Lock()
+
+    def round_trip(self) -> None:
+        with self.lock:
+            self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def read(self, path: str, field_paths: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            data = self.docs.get(path)
+        if data is None:
+            return None
+        if field_paths is not None:
+            return {key: data[key] for key in field_paths if key in data}
+        return dict(data)
+
+    def write(self, path: str, data: Dict[str, Any]) -> None:
+        with self.lock:
+            self.docs[path] = dict(data)
+
+    def collection(self, name: str) -> InMemoryCollection:
+        return InMemoryCollection(self, name)
+
+    def get_all(self, refs: List[InMemoryDocument], field_paths: Optional[List[str]] = None) -> Iterator[InMemorySnapshot]:
+        self.round_trip()
+        for ref in refs:
+            yield InMemorySnapshot(ref, self.read(ref.path, field_paths))
+
+    def batch(self) -> InMemoryWriteBatch:
+        return InMemoryWriteBatch(self)
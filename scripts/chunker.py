@@ -0,0 +1,105 @@
+import re
+from typing import Any, List, Optional, Sequence, Tuple
+
+# A sentence runs up to terminal punctuation followed by whitespace, a line break
+# (section boundary in raw scraped text) or the end of the string
+SENTENCE = re.compile(r"\S[^\n]*?(?:[.!?]+(?=\s)|(?=\n)|$)")
+# Rough stand-in for WordPiece pre-tokenization when no model tokenizer is available
+WORD = re.compile(r"\w+|[^\w\s]")
+
+Span = Tuple[int, int]
+Piece = Tuple[int, int, int]  # (start offset, end offset, token count)
+
+
+class RegexTokenCounter:
+    """Approximate token counts from word/punctuation matches."""
+
+    def count(self, texts: Sequence[str]) -> List[int]:
+        return [sum(1 for _ in WORD.finditer(text)) for text in texts]
+
+    def offsets(self, text: str) -> List[Span]:
+        return [match.span() for match in WORD.finditer(text)]
+
+
+class HFTokenCounter:
+    """Exact token counts and offsets from a Hugging Face fast tokenizer."""
+
+    def __init__(self, tokenizer: Any) -> None:
+        self.tokenizer = tokenizer
+
+    def count(self, texts: Sequence[str]) -> List[int]:
+        if not texts:
+            return []
+        encoded = self.tokenizer(list(texts), add_special_tokens=False, truncation=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def offsets(self, text: str) -> List[Span]:
+        encoded = self.tokenizer(
+            text, add_special_tokens=False, truncation=False, return_offsets_mapping=True
+        )
+        return [tuple(span) for span in encoded["offset_mapping"]]
+
+
+class TokenChunker:
+    """Split text into chunks that fit the embedding model's token window.
+
+    Text is cut at sentence boundaries and sentences are packed greedily until
+    ``max_tokens`` is reached; consecutive chunks share up to ``overlap_tokens``
+    of trailing sentences. Sentences longer than the window are split on token
+    offsets. All work is done on (start, end) offsets into the original string,
+    so each chunk is a single slice of the input.
+    """
+
+    def __init__(self, tokenizer: Optional[Any] = None, max_tokens: int = 254, overlap_tokens: int = 32) -> None:
+        self.counter = HFTokenCounter(tokenizer) if tokenizer is not None else RegexTokenCounter()
+        self.max_tokens = max_tokens
+        self.overlap_tokens = min(overlap_tokens, max_tokens // 2)
+
+    @staticmethod
+    def sentence_spans(text: str) -> List[Span]:
+        return [match.span() for match in SENTENCE.finditer(text)]
+
+    def pieces(self, text: str) -> List[Piece]:
+        """Sentence spans with token counts, over-long sentences split into window-sized parts."""
+        spans = self.sentence_spans(text)
+        counts = self.counter.count([text[start:end] for start, end in spans])
+
+        pieces: List[Piece] = []
+        for (start, end), tokens in zip(spans, counts):
+            if tokens <= self.max_tokens:
+                pieces.append((start, end, tokens))
+                continue
+            offsets = self.counter.offsets(text[start:end])
+            for i in range(0, len(offsets), self.max_tokens):
+                window = offsets[i:i + self.max_tokens]
+                pieces.append((start + window[0][0], start + window[-1][1], len(window)))
+        return pieces
+
+    def chunk_spans(self, text: str) -> List[Span]:
+        pieces = self.pieces(text)
+        spans: List[Span] = []
+
+        first = 0
+        while first < len(pieces):
+            total = 0
+            last = first
+            while last < len(pieces) and total + pieces[last][2] <= self.max_tokens:
+                total += pieces[last][2]
+                last += 1
+            last = max(last, first + 1)
+            spans.append((pieces[first][0], pieces[last - 1][1]))
+            if last >= len(pieces):
+                break
+
+            # Step back over trailing sentences to build the overlap for the next chunk
+            overlap = 0
+            next_first = last
+            while next_first - 1 > first and overlap + pieces[next_first - 1][2] <= self.overlap_tokens:
+                next_first -= 1
+                overlap += pieces[next_first][2]
+            first = next_first
+
+        return spans
+
+    def chunk(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.chunk_spans(text)]
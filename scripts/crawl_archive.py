@@ -0,0 +1,189 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from crawl_checkpoint import _read_json, _write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_NAME = "pages.jsonl.gz"
+# Not *.json, so loaders that glob the college folder never treat it as a page
+INDEX_NAME = "pages.index"
+
+
+def archive_path(college_folder: str) -> str:
+    return os.path.join(college_folder, ARCHIVE_NAME)
+
+
+def index_path(college_folder: str) -> str:
+    return os.path.join(college_folder, INDEX_NAME)
+
+
+def url_key(url: str) -> str:
+    """Short stable key for a URL; the archive holds at most one live record per key."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+def archive_doc_id(filename: str, key: str) -> str:
+    """Readable, collision-free doc ID: generate_filename() stem plus the URL key."""
+    return f"{filename.replace('.json', '')}_{key[:8]}"
+
+
+def _scan(path: str, state: Optional[Dict[str, bool]] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(seq, record) pairs in file order; sets state["truncated"] if the file ends in a torn write."""
+    if not os.path.exists(path):
+        return
+    seq = 0
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                yield seq, json.loads(line)
+                seq += 1
+    except (EOFError, ValueError, zlib.error, OSError) as e:
+        # A crawl killed mid-write leaves an unterminated gzip member; records after it are unreadable
+        if state is not None:
+            state["truncated"] = True
+        else:
+            logger.warning("Archive %s is torn after record %d (%s); open it with CrawlArchive to repair",
+                           path, seq, e)
+
+
+class CrawlArchive:
+    """Append-only, gzip-compressed JSONL store for one college's pages.
+
+    Each page is one JSON line keyed by ``url_key(url)``. Re-crawled pages are
+    appended, and the newest record for a key wins. The index (key -> seq, url,
+    doc_id, content_hash) lets readers stream only the live records in one pass.
+    Call ``save_index()`` at checkpoints and ``close()`` when done.
+    """
+
+    def __init__(self, college_folder: str) -> None:
+        self.path = archive_path(college_folder)
+        self.index_file = index_path(college_folder)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.records = 0
+        self._file: Optional[gzip.GzipFile] = None
+
+        index = _read_json(self.index_file)
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        # A matching size is not enough: a crawl killed after save_index() leaves its gzip
+        # member unterminated, and appending after it would make everything unreadable
+        if index and index.get("size") == size and index.get("closed"):
+            self.entries = index.get("urls", {})
+            self.records = index.get("records", 0)
+        elif size:
+            self.rebuild_index()
+
+    def rebuild_index(self) -> None:
+        """Re-derive the index from the archive itself; repairs a torn tail by compacting."""
+        state = {"truncated": False}
+        self.entries = {}
+        self.records = 0
+        for seq, record in _scan(self.path, state):
+            self.entries[record["key"]] = self._entry(seq, record)
+            self.records = seq + 1
+        if state["truncated"]:
+            logger.warning("Repairing truncated archive %s", self.path)
+            self.compact()
+        else:
+            self.save_index()
+
+    @staticmethod
+    def _entry(seq: int, record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "seq": seq,
+            "url": record.get("url", ""),
+            "doc_id": record.get("doc_id", ""),
+            "content_hash": record.get("content_hash", "")
+        }
+
+    def has(self, url: str) -> bool:
+        return url_key(url) in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def append(self, filename: str, page_data: Dict[str, Any]) -> str:
+        """Append a page record and return its doc ID."""
+        key = url_key(page_data["url"])
+        record = dict(page_data, key=key, doc_id=archive_doc_id(filename, key))
+        if self._file is None:
+            # A new gzip member per session; gzip readers concatenate members transparently
+            self._file = gzip.open(self.path, "ab")
+        self._file.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        # Sync flush keeps every finished record readable even if the crawl is killed
+        self._file.flush()
+        self.entries[key] = self._entry(self.records, record)
+        self.records += 1
+        return record["doc_id"]
+
+    def save_index(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        # closed: every gzip member in the file is terminated (no writer session is open)
+        _write_json_atomic(self.index_file, {
+            "records": self.records, "size": size, "closed": self._file is None, "urls": self.entries
+        })
+
+    def compact(self) -> None:
+        """Rewrite the archive with only the live record for each key."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        tmp_path = f"{self.path}.tmp"
+        entries: Dict[str, Dict[str, Any]] = {}
+        with gzip.open(tmp_path, "wb") as out:
+            latest = {key: entry["seq"] for key, entry in self.entries.items()}
+            # Scanned directly: a torn tail is expected here and was already reported
+            for seq, record in _scan(self.path, {}):
+                if latest.get(record.get("key")) != seq:
+                    continue
+                out.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+                entries[record["key"]] = self._entry(len(entries), record)
+        os.replace(tmp_path, self.path)
+        self.entries = entries
+        self.records = len(entries)
+        self.save_index()
+
+    def close(self) -> None:
+        """Close the current gzip member, compacting first if most records are superseded."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.records > 2 * len(self.entries):
+            self.compact()
+        else:
+            self.save_index()
+
+
+def read_archive(college_folder: str, entries: Optional[Dict[str, Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+    """Stream the live (newest) record for every URL in a college's archive.
+
+    Uses the index when it matches the archive; otherwise the archive is read twice
+    (once to find the newest record per key), which never holds more than one
+    record in memory.
+    """
+    path = archive_path(college_folder)
+    if not os.path.exists(path):
+        return
+    if entries is None:
+        index = _read_json(index_path(college_folder))
+        if index and index.get("size") == os.path.getsize(path) and index.get("closed"):
+            entries = index.get("urls", {})
+    if entries is None:
+        latest: Dict[str, int] = {}
+        for seq, record in _scan(path):
+            latest[record["key"]] = seq
+    else:
+        latest = {key: entry["seq"] for key, entry in entries.items()}
+
+    for seq, record in _scan(path):
+        if latest.get(record.get("key")) == seq:
+            yield record
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def checkpoint_path(out_folder: str, college_name: str) -> str:
+    """Checkpoint lives next to the college folder so loaders never pick it up as a page."""
+    return os.path.join(out_folder, f"{college_name}.checkpoint.json")
+
+
+def manifest_path(out_folder: str, college_name: str) -> str:
+    """Per-URL content hashes and HTTP validators used by incremental crawls."""
+    return os.path.join(out_folder, f"{college_name}.manifest.json")
+
+
+def dead_letter_path(out_folder: str, college_name: str) -> str:
+    """URLs the crawler gave up on, with their last error."""
+    return os.path.join(out_folder, f"{college_name}.dead_letter.json")
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable file %s: %s", path, e)
+        return None
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    """Atomically write the crawl state (write to a temp file, then rename)."""
+    _write_json_atomic(path, dict(state, updated_at=time.strftime("%Y-%m-%d %H:%M:%S")))
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    """Return the saved crawl state, or None if there is no usable checkpoint."""
+    return _read_json(path)
+
+
+def save_dead_letters(path: str, base_url: str, dead_letters: List[Dict[str, Any]]) -> None:
+    """Write the dead-letter report of one crawl (replaces the previous run's report)."""
+    _write_json_atomic(path, {
+        "base_url": base_url,
+        "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "failed": dead_letters
+    })
+
+
+def content_hash(title: str, text: str) -> str:
+    """Stable fingerprint of the extracted page content."""
+    return hashlib.sha256(f"{title}\n{text}".encode("utf-8")).hexdigest()
+
+
+class CrawlManifest:
+    """What each URL looked like on the last crawl: content hash, ETag,
+    Last-Modified, output filename and the university links found on it."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = _read_json(path) or {}
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(url)
+
+    def update(self, url: str, **fields: Any) -> None:
+        self.entries.setdefault(url, {}).update(fields)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a revalidation request."""
+        entry = self.entries.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def save(self) -> None:
+        _write_json_atomic(self.path, self.entries)
@@ -0,0 +1,90 @@
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings map to the same page.
+
+    Lowercases scheme and host, drops default ports and the fragment, sorts
+    query parameters and removes the trailing slash from non-root paths.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class CrawlFrontier:
+    """FIFO crawl frontier with O(1) push/pop and canonical-URL deduplication.
+
+    An optional ``priority`` function maps a URL to an integer tier; lower
+    tiers are always served first and URLs keep FIFO order within a tier.
+    """
+
+    def __init__(self, priority: Optional[Callable[[str], int]] = None) -> None:
+        self.priority = priority
+        self._queues: Dict[int, Deque[str]] = {}
+        self._seen: Set[str] = set()
+        self._size = 0
+
+    def add(self, url: str) -> bool:
+        """Queue a URL unless its canonical form was already seen. Returns True if queued."""
+        key = canonicalize_url(url)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+
+        tier = self.priority(key) if self.priority else 0
+        self._queues.setdefault(tier, deque()).append(key)
+        self._size += 1
+        return True
+
+    def pop(self) -> Optional[str]:
+        """Return the next URL to crawl, or None when the frontier is empty."""
+        for tier in sorted(self._queues):
+            queue = self._queues[tier]
+            if queue:
+                self._size -= 1
+                return queue.popleft()
+        return None
+
+    def pending(self) -> List[str]:
+        """Queued URLs in the order they would be popped."""
+        return [url for tier in sorted(self._queues) for url in self._queues[tier]]
+
+    def to_state(self, in_flight: Iterable[str] = ()) -> Dict[str, Any]:
+        """Serializable snapshot; in-flight URLs are put back at the front of the queue."""
+        in_flight = [canonicalize_url(url) for url in in_flight]
+        return {
+            "pending": in_flight + self.pending(),
+            "seen": sorted(self._seen),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], priority: Optional[Callable[[str], int]] = None) -> "CrawlFrontier":
+        """Rebuild a frontier from a ``to_state`` snapshot."""
+        frontier = cls(priority=priority)
+        for url in state.get("pending", []):
+            frontier.add(url)
+        frontier._seen.update(state.get("seen", []))
+        return frontier
+
+    def seen(self, url: str) -> bool:
+        return canonicalize_url(url) in self._seen
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
@@ -0,0 +1,120 @@
+import re
+import hashlib
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+WORD = re.compile(r"\w+")
+WHITESPACE = re.compile(r"\s+")
+
+FINGERPRINT_BITS = 64
+# Pages/chunks whose fingerprints differ in at most this many bits are near-duplicates
+# (unrelated texts differ in about 32 bits)
+MAX_DISTANCE = 6
+
+
+def _hash64(value: str) -> int:
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shingles(text: str, size: int = 4) -> List[str]:
+    """Overlapping word n-grams of lower-cased text (the whole text if it is shorter)."""
+    words = WORD.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text: str, size: int = 4) -> int:
+    """64-bit SimHash over word shingles; similar texts get fingerprints a few bits apart."""
+    hashes = [_hash64(shingle) for shingle in set(shingles(text, size))]
+    if not hashes:
+        return 0
+    # Column-wise bit counts via zip over the binary strings (C speed, not a Python loop per bit)
+    half = len(hashes) / 2
+    columns = zip(*(format(h, "064b") for h in hashes))
+    bits = "".join("1" if column.count("1") > half else "0" for column in columns)
+    return int(bits, 2)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """Near-duplicate lookup over 64-bit fingerprints.
+
+    Fingerprints are split into MAX_DISTANCE + 1 bands; two fingerprints within
+    MAX_DISTANCE bits must agree on at least one band, so only fingerprints
+    sharing a band are compared.
+    """
+
+    def __init__(self, max_distance: int = MAX_DISTANCE) -> None:
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.bands
+        self.buckets: List[Dict[int, List[Tuple[str, int]]]] = [{} for _ in range(self.bands)]
+        self.lock = threading.Lock()
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (i * self.band_bits)) & mask for i in range(self.bands)]
+
+    def find(self, fingerprint: int) -> Optional[str]:
+        """Key of a stored near-duplicate of ``fingerprint``, or None."""
+        for band, value in zip(self.buckets, self._band_values(fingerprint)):
+            for key, other in band.get(value, ()):
+                if hamming(fingerprint, other) <= self.max_distance:
+                    return key
+        return None
+
+    def add(self, key: str, fingerprint: int) -> Optional[str]:
+        """Store ``fingerprint`` under ``key`` unless it duplicates an earlier one.
+
+        Returns the earlier key for a duplicate (nothing is stored), else None.
+        """
+        with self.lock:
+            existing = self.find(fingerprint)
+            if existing is not None:
+                return existing
+            for band, value in zip(self.buckets, self._band_values(fingerprint)):
+                band.setdefault(value, []).append((key, fingerprint))
+            return None
+
+
+class BoilerplateFilter:
+    """Drops lines that repeat across most pages of one college (nav, footers, promos).
+
+    Call ``observe()`` once per page, then ``strip()``. Lines are compared after
+    lower-casing and collapsing whitespace. Nothing is stripped until at least
+    ``min_docs`` pages were observed.
+    """
+
+    def __init__(self, threshold: float = 0.5, min_docs: int = 5) -> None:
+        self.threshold = threshold
+        self.min_docs = min_docs
+        self.docs = 0
+        self.line_docs: Counter = Counter()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(line: str) -> str:
+        return WHITESPACE.sub(" ", line).strip().lower()
+
+    def observe(self, text: str) -> None:
+        keys = {self._key(line) for line in text.splitlines()}
+        keys.discard("")
+        with self.lock:
+            self.docs += 1
+            self.line_docs.update(keys)
+
+    def is_boilerplate(self, line: str) -> bool:
+        if self.docs < self.min_docs:
+            return False
+        return self.line_docs.get(self._key(line), 0) >= self.threshold * self.docs
+
+    def strip(self, text: str) -> str:
+        if not text or self.docs < self.min_docs:
+            return text
+        return "\n".join(line for line in text.splitlines() if not self.is_boilerplate(line))
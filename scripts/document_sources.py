@@ -0,0 +1,212 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from crawl_archive import read_archive
+from dedup import BoilerplateFilter, SimHashIndex, simhash
+from metrics import METRICS
+
+if TYPE_CHECKING:
+    from google.cloud import firestore
+
+logger = logging.getLogger(__name__)
+
+# Compiled once; clean_content runs for every document
+WHITESPACE = re.compile(r"\s+")
+AD_BLOCK = re.compile(r"Get Upto.*?Explore", flags=re.IGNORECASE)
+
+Document = Tuple[str, Dict[str, Any]]
+
+# Same value as firestore.FieldPath.document_id(), without importing the client library
+DOCUMENT_ID = "__name__"
+
+
+def clean_content(text: str) -> str:
+    """Clean scraped text by removing newlines, multiple spaces, and junk."""
+    if not text:
+        return ""
+    # Collapse whitespace/newlines
+    text = WHITESPACE.sub(" ", text)
+    # Example: remove ad-like patterns
+    text = AD_BLOCK.sub("", text)
+    return text.strip()
+
+
+def normalize_document(file_name: str, data: Dict[str, Any]) -> Document:
+    """Clean a scraped JSON the way it is stored in Firestore and return (doc ID, data)."""
+    # Ensure required fields exist
+    data["content"] = clean_content(data.get("content", ""))
+    data["category"] = str(data.get("category", "unknown"))
+    data["scraped_at"] = str(data.get("scraped_at", ""))
+    data["url"] = str(data.get("url", ""))
+    data["title"] = str(data.get("title", ""))
+    data["content_hash"] = str(
+        data.get("content_hash") or hashlib.sha256(data["content"].encode("utf-8")).hexdigest()
+    )
+
+    # Use filename (without extension) as doc ID
+    return file_name.replace(".json", ""), data
+
+
+def strip_boilerplate(data: Dict[str, Any], boilerplate: BoilerplateFilter) -> Dict[str, Any]:
+    """Drop a college's boilerplate lines from a raw scraped JSON (in place).
+
+    The crawler's content_hash describes the unstripped page, so when stripping changes the
+    text it is dropped and normalize_document() hashes the stored content instead. Otherwise
+    incremental loads and syncs would skip pages whose stored text differs from the hash.
+    """
+    content = str(data.get("content", ""))
+    stripped = boilerplate.strip(content)
+    if stripped != content:
+        data["content"] = stripped
+        data.pop("content_hash", None)
+    return data
+
+
+class FirestoreSource:
+    """Documents stored under /collegeScrape/{college}/data/* by save_colleges_to_db.py.
+
+    College discovery lists parent documents directly (paginated, including parents that
+    only hold a 'data' subcollection), so it costs O(colleges) rather than O(documents).
+    The list can be cached on disk for ``cache_ttl`` seconds.
+    """
+
+    name = "Firestore"
+
+    def __init__(
+        self,
+        page_size: int = 300,
+        cache_path: Optional[str] = None,
+        cache_ttl: float = 3600,
+        client: Optional["firestore.Client"] = None
+    ) -> None:
+        self.page_size = page_size
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl
+        self._db: Optional["firestore.Client"] = client
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> "firestore.Client":
+        with self._lock:
+            if self._db is None:
+                from google.cloud import firestore
+                print("Initializing Firestore client...")
+                self._db = firestore.Client()
+                print("Firestore client initialized.")
+            return self._db
+
+    def list_colleges(self, refresh: bool = False) -> List[str]:
+        cached = None if refresh else self._load_cache()
+        if cached is None:
+            collection_ref = self.db.collection("collegeScrape")
+            with METRICS.timer("firestore_list_colleges"):
+                cached = sorted(ref.id for ref in collection_ref.list_documents(page_size=self.page_size))
+            self._save_cache(cached)
+        return cached
+
+    def _load_cache(self) -> Optional[List[str]]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        if time.time() - os.path.getmtime(self.cache_path) > self.cache_ttl:
+            return None
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cache(self, colleges: List[str]) -> None:
+        if not self.cache_path:
+            return
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump(colleges, f)
+
+    def iter_documents(self, college: str) -> Iterator[Document]:
+        """
+        Stream (doc_id, data) for /collegeScrape/{college}/data/* page by page,
+        using a document-ID cursor so only one page is held in memory at a time.
+        """
+        collection_ref = self.db.collection("collegeScrape").document(college).collection("data")
+        query = collection_ref.order_by(DOCUMENT_ID).limit(self.page_size)
+
+        last_doc = None
+        while True:
+            page_query = query.start_after(last_doc) if last_doc is not None else query
+            with METRICS.timer("firestore_page"):
+                docs = list(page_query.stream())
+            METRICS.incr("firestore_reads", len(docs))
+            for doc in docs:
+                doc_data = doc.to_dict()
+                if doc_data:  # Only yield non-empty documents
+                    yield doc.id, doc_data
+            if len(docs) < self.page_size:
+                return
+            last_doc = docs[-1]
+
+
+class LocalFolderSource:
+    """Scraped pages read straight from the ``<base>/<college>/`` folders written by scrape(),
+    both per-page ``*.json`` files and the compressed crawl archive (--format jsonl).
+
+    Documents are normalized exactly like save_colleges_to_db.py does before upload,
+    so doc IDs, content and hashes match what a Firestore round trip would produce
+    (including its --dedup boilerplate stripping and near-duplicate skipping).
+    """
+
+    name = "local folder"
+
+    def __init__(self, base_path: str = "./scraped_data", dedup: bool = False) -> None:
+        self.base_path = base_path
+        self.dedup = dedup
+
+    def folders(self) -> Dict[str, str]:
+        """College ID (upper-cased folder name, as in Firestore) -> folder path"""
+        with os.scandir(self.base_path) as entries:
+            return {entry.name.upper(): entry.path for entry in entries if entry.is_dir()}
+
+    def list_colleges(self, refresh: bool = False) -> List[str]:
+        return sorted(self.folders())
+
+    @staticmethod
+    def iter_raw(folder: str) -> Iterator[Document]:
+        """(file name or archive doc ID, data) before normalization"""
+        with os.scandir(folder) as entries:
+            names = sorted(entry.name for entry in entries if entry.name.endswith(".json") and entry.is_file())
+        for file_name in names:
+            try:
+                with open(os.path.join(folder, file_name), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Error reading %s: %s", file_name, e)
+                continue
+            if data:
+                yield file_name, data
+        for record in read_archive(folder):
+            doc_id = record.pop("doc_id")
+            record.pop("key", None)
+            yield doc_id, record
+
+    def iter_documents(self, college: str) -> Iterator[Document]:
+        folder = self.folders().get(college.upper())
+        if folder is None:
+            return
+        if not self.dedup:
+            for file_name, data in self.iter_raw(folder):
+                yield normalize_document(file_name, data)
+            return
+
+        # First pass learns the college's boilerplate lines, second pass strips them
+        boilerplate = BoilerplateFilter()
+        for _, data in self.iter_raw(folder):
+            boilerplate.observe(str(data.get("content", "")))
+        seen = SimHashIndex()
+        for file_name, data in self.iter_raw(folder):
+            doc_id, data = normalize_document(file_name, strip_boilerplate(data, boilerplate))
+            if seen.add(doc_id, simhash(data["content"])) is None:
+                yield doc_id, data
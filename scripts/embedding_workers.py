@@ -0,0 +1,65 @@
+import os
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, List, Optional
+
+# Per-process model, loaded once by the pool initializer
+_model: Any = None
+_batch_size = 64
+_normalize = False
+
+
+def _init_worker(model_name: str, torch_threads: int, batch_size: int, normalize: bool) -> None:
+    global _model, _batch_size, _normalize
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # Without this every worker would spawn one intra-op thread per core and oversubscribe the CPU
+    torch.set_num_threads(torch_threads)
+    _model = SentenceTransformer(model_name, device="cpu")
+    _batch_size = batch_size
+    _normalize = normalize
+
+
+def _encode(texts: List[str]) -> Any:
+    return _model.encode(
+        texts,
+        batch_size=_batch_size,
+        normalize_embeddings=_normalize,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    )
+
+
+class EmbeddingPool:
+    """Process pool where each worker holds its own SentenceTransformer.
+
+    Batches are submitted from the parent and come back as float32 numpy arrays;
+    the parent stays the single writer to ChromaDB.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        processes: int,
+        torch_threads: Optional[int] = None,
+        batch_size: int = 64,
+        normalize: bool = False
+    ) -> None:
+        self.processes = max(1, processes)
+        if torch_threads is None:
+            torch_threads = max(1, (os.cpu_count() or 1) // self.processes)
+        # spawn, not fork: forking a process that already initialized torch can deadlock
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, torch_threads, batch_size, normalize)
+        )
+        print(f"Embedding pool: {self.processes} processes x {torch_threads} torch threads")
+
+    def submit(self, texts: List[str]) -> "Future[Any]":
+        return self.executor.submit(_encode, texts)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
@@ -1,94 +1,218 @@
 import os
-from typing import List, Dict, Any
-from google.cloud import firestore
-from openai import OpenAI
-import chromadb
-from sentence_transformers import SentenceTransformer 
+import queue
+import logging
+import hashlib
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, List, Dict, Any, Callable, Deque, Iterator, Optional, Set, Tuple
+
+from chunker import TokenChunker
+from dedup import SimHashIndex, simhash
+from document_sources import Document, FirestoreSource
+from embedding_workers import EmbeddingPool
+from metrics import METRICS
+
+# Heavy client libraries are imported on first use so short-lived commands start fast
+if TYPE_CHECKING:
+    from embedding_cache import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# Hub repo and token window of EMBEDDING_MODEL, so chunking never needs the model itself
+EMBEDDING_TOKENIZER = f"sentence-transformers/{EMBEDDING_MODEL}"
+EMBEDDING_MAX_SEQ_LENGTH = 256
+COLLECTION_NAME = "procounsel_colleges"
+
+# Marks the end of a pipeline queue
+_END = object()
+
+ChunkBatch = Tuple[List[str], List[str], List[Dict[str, str]]]
 
 
 class FirestoreToVectorDB:
-    def __init__(self, persist_dir: str = "./chroma_db") -> None:  # Remove openai_key parameter
-        # Firestore client
-        print("Initializing Firestore client...")
-        self.db: firestore.Client = firestore.Client()
-        print("Firestore client initialized.")
-        # Local embedding model
-        print("Loading local embedding model...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')  # Free, local model
-        print("Local embedding model loaded.")
-        # Chroma client
-        print("Initializing ChromaDB client...")
-        self.client_chroma: chromadb.Client = chromadb.PersistentClient(path=persist_dir)
-        print("ChromaDB client initialized.")
-        # Create or get collection
-        print("Getting or creating ChromaDB collection...")
-        self.collection = self.client_chroma.get_or_create_collection("procounsel_colleges")
-        print("ChromaDB collection ready.")
-
-    def get_all_colleges(self) -> List[str]:
+    def __init__(
+        self,
+        persist_dir: str = "./chroma_db",
+        embed_batch_size: int = 64,
+        write_batch_size: int = 1024,
+        normalize_embeddings: bool = False,
+        cache_path: Optional[str] = None,
+        cache_max_entries: int = 500_000,
+        page_size: int = 300,
+        queue_size: int = 256,
+        colleges_cache_path: Optional[str] = None,
+        colleges_cache_ttl: float = 3600,
+        max_chunk_tokens: Optional[int] = None,
+        overlap_tokens: int = 32,
+        embed_workers: int = 0,
+        torch_threads: Optional[int] = None,
+        source: Any = None,
+        dedup: bool = False
+    ) -> None:
+        # Where documents come from: Firestore by default, or any object with
+        # list_colleges() and iter_documents() (see document_sources.py)
+        self.source = source if source is not None else FirestoreSource(
+            page_size, colleges_cache_path, colleges_cache_ttl
+        )
+        # Backends (model, Chroma, cache, process pool) are created lazily by
+        # the properties below, so e.g. a status query never loads the model
+        self.persist_dir = persist_dir
+        self.cache_path = cache_path
+        self.cache_max_entries = cache_max_entries
+        self.max_chunk_tokens = max_chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.embed_workers = embed_workers
+        self.torch_threads = torch_threads
+        self._embedding_model: Any = None
+        self._chunker: Optional[TokenChunker] = None
+        self._embedding_pool: Optional[EmbeddingPool] = None
+        self._embedding_cache: Optional["EmbeddingCache"] = None
+        self._client_chroma: Any = None
+        self._collection: Any = None
+        # Pipeline threads may touch a backend first; only one of them should build it
+        self._init_lock = threading.RLock()
+
+        # Chunks are buffered across documents and colleges, then embedded with one
+        # encode() call and written to ChromaDB once write_batch_size is reached
+        self.embed_batch_size = embed_batch_size
+        self.write_batch_size = write_batch_size
+        self.normalize_embeddings = normalize_embeddings
+        # Firestore page size and the bound on documents waiting between pipeline stages
+        self.page_size = page_size
+        self.queue_size = queue_size
+        # College discovery result, cached in memory (FirestoreSource can also cache it on disk)
+        self._colleges_cache: Optional[List[str]] = None
+        self.pending_ids: List[str] = []
+        self.pending_chunks: List[str] = []
+        self.pending_metadatas: List[Dict[str, str]] = []
+        self.total_chunks_written = 0
+        self.failed_chunks = 0
+        # Near-duplicate chunk fingerprints per college (boilerplate that survived cleaning,
+        # tabs repeating the same section); only used with dedup
+        self.dedup = dedup
+        self.chunk_fingerprints: Dict[str, SimHashIndex] = {}
+        self.duplicate_chunks = 0
+
+    @property
+    def embedding_model(self) -> Any:
+        with self._init_lock:
+            if self._embedding_model is None:
+                from sentence_transformers import SentenceTransformer
+                print("Loading local embedding model...")
+                self._embedding_model = SentenceTransformer(EMBEDDING_MODEL)  # Free, local model
+                print("Local embedding model loaded.")
+            return self._embedding_model
+
+    @property
+    def chunker(self) -> TokenChunker:
+        with self._init_lock:
+            if self._chunker is None:
+                # Chunks are sized in model tokens so nothing is truncated by the encoder. Only the
+                # tokenizer is loaded (its own instance, since it runs on the pipeline's chunk thread),
+                # so with --embed-workers the parent holds no model copy of its own.
+                from transformers import AutoTokenizer
+                max_tokens = self.max_chunk_tokens
+                if max_tokens is None:
+                    max_tokens = EMBEDDING_MAX_SEQ_LENGTH - 2  # [CLS] and [SEP]
+                self._chunker = TokenChunker(
+                    AutoTokenizer.from_pretrained(EMBEDDING_TOKENIZER),
+                    max_tokens=max_tokens,
+                    overlap_tokens=self.overlap_tokens
+                )
+            return self._chunker
+
+    @property
+    def embedding_pool(self) -> Optional[EmbeddingPool]:
+        """Optional process pool; the parent stays the only ChromaDB writer"""
+        with self._init_lock:
+            if self._embedding_pool is None and self.embed_workers > 0:
+                self._embedding_pool = EmbeddingPool(
+                    EMBEDDING_MODEL, self.embed_workers, self.torch_threads,
+                    self.embed_batch_size, self.normalize_embeddings
+                )
+            return self._embedding_pool
+
+    @property
+    def embedding_cache(self) -> Optional["EmbeddingCache"]:
+        """Optional on-disk cache so unchanged chunks are never re-embedded"""
+        with self._init_lock:
+            if self._embedding_cache is None and self.cache_path:
+                from embedding_cache import EmbeddingCache
+                signature = f"{EMBEDDING_MODEL}|normalize={self.normalize_embeddings}"
+                self._embedding_cache = EmbeddingCache(self.cache_path, signature, self.cache_max_entries)
+                print(f"Embedding cache: {self.cache_path} ({len(self._embedding_cache)} entries)")
+            return self._embedding_cache
+
+    @property
+    def client_chroma(self) -> Any:
+        with self._init_lock:
+            if self._client_chroma is None:
+                import chromadb
+                print("Initializing ChromaDB client...")
+                self._client_chroma = chromadb.PersistentClient(path=self.persist_dir)
+                print("ChromaDB client initialized.")
+            return self._client_chroma
+
+    @property
+    def collection(self) -> Any:
+        with self._init_lock:
+            if self._collection is None:
+                print("Getting or creating ChromaDB collection...")
+                self._collection = self.client_chroma.get_or_create_collection(COLLECTION_NAME)
+                print("ChromaDB collection ready.")
+            return self._collection
+
+    def status(self, colleges: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Cheap summary of the vector store: only opens Chroma, never the document source or the model"""
+        info: Dict[str, Any] = {"persist_dir": self.persist_dir, "total_vectors": self.collection.count()}
+        if colleges:
+            info["colleges"] = {
+                name.upper(): len(self.collection.get(where={"college": name.upper()}, include=[])["ids"])
+                for name in colleges
+            }
+        if self.cache_path and os.path.exists(self.cache_path):
+            info["embedding_cache_entries"] = len(self.embedding_cache)
+        return info
+
+    def get_all_colleges(self, colleges: Optional[List[str]] = None, refresh: bool = False) -> List[str]:
         """
-        Dynamically discover all college document IDs by querying the 'data' collection group
-        and extracting parent document IDs from the paths.
+        List college IDs from the document source. The result is cached on the instance
+        (and on disk for Firestore, if configured). Pass ``colleges`` to restrict the
+        result to a subset.
         """
-        # Use collection group query to find all 'data' subcollections
-        data_docs = self.db.collection_group("data").limit(1).stream()
-        
-        colleges = set()
-        for doc in data_docs:
-            # Extract college ID from document path
-            # Path format: collegeScrape/{college_id}/data/{doc_id}
-            path_segments = doc.reference.path.split('/')
-            if len(path_segments) >= 2 and path_segments[0] == "collegeScrape":
-                college_id = path_segments[1]
-                colleges.add(college_id)
-        
-        # Alternative method: Get unique parent documents from all data subcollections
-        if not colleges:
-            all_data_docs = self.db.collection_group("data").stream()
-            for doc in all_data_docs:
-                path_segments = doc.reference.path.split('/')
-                if len(path_segments) >= 2 and path_segments[0] == "collegeScrape":
-                    college_id = path_segments[1]
-                    colleges.add(college_id)
-                    
-                    # Break after finding a few to avoid processing all documents
-                    if len(colleges) >= 10:
-                        break
-        print("Found the following colleges:", colleges)  # DEBUG
-        return list(colleges)
+        if self._colleges_cache is None or refresh:
+            self._colleges_cache = self.source.list_colleges(refresh=refresh)
+
+        found = list(self._colleges_cache)
+        if colleges:
+            wanted = {name.upper() for name in colleges}
+            missing = wanted.difference(found)
+            if missing:
+                print(f"Colleges not found in {self.source.name}: {sorted(missing)}")
+            found = [name for name in found if name in wanted]
+
+        logger.debug("Found %d colleges", len(found))
+        return found
+
+    def iter_json_docs(self, college_doc: str) -> Iterator[Document]:
+        """
+        Stream (doc_id, data) for one college from the document source, one page
+        (or file) at a time.
+        """
+        return self.source.iter_documents(college_doc)
 
     def get_all_json_docs(self, college_doc: str) -> Dict[str, Dict[str, Any]]:
         """
-        Return all JSON docs under /collegeScrape/{college_doc}/data/*
+        Return all JSON docs for one college
         """
-        collection_ref = self.db.collection("collegeScrape").document(college_doc).collection("data")
-        docs = collection_ref.stream()
-        
-        data: Dict[str, Dict[str, Any]] = {}
-        
-        for doc in docs:
-            doc_data = doc.to_dict()
-            if doc_data:  # Only add non-empty documents
-                data[doc.id] = doc_data
-        
-        print(f"  Retrieved {len(data)} documents for {college_doc}")  # DEBUG
+        data: Dict[str, Dict[str, Any]] = dict(self.iter_json_docs(college_doc))
+        logger.debug("Retrieved %d documents for %s", len(data), college_doc)
         return data
 
-    def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
-        """Split text into overlapping chunks"""
-        words = text.split()
-        chunks: List[str] = []
-        start = 0
-        
-        while start < len(words):
-            end = min(start + chunk_size, len(words))
-            chunk = " ".join(words[start:end])
-            if chunk.strip():  # Only add non-empty chunks
-                chunks.append(chunk)
-            start += chunk_size - overlap
-            
-        print("Chunking done, total chunks:", len(chunks))  # DEBUG
-        return chunks
+    def chunk_text(self, text: str) -> List[str]:
+        """Split text into overlapping, token-bounded chunks on sentence boundaries"""
+        return self.chunker.chunk(text)
 
     # def embed_text(self, text: str) -> List[float]:
     #     """Generate embedding vector using OpenAI"""
@@ -99,101 +223,426 @@ class FirestoreToVectorDB:
     #     return response.data[0].embedding
     def embed_text(self, text: str) -> List[float]:
         """Generate embedding vector using local Sentence Transformers"""
-        embedding = self.embedding_model.encode(text)
+        return self.embed_texts([text])[0]
 
-        print("Embedding generated, length:", len(embedding))  # DEBUG
-        return embedding.tolist() 
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed many texts with a single batched encode() call, reusing cached vectors"""
+        return self.embed_texts_async(texts)()
 
-    def save_to_vector_db(self, college_name: str) -> None:
-        """Fetch all JSONs for a college and store chunks in ChromaDB"""
-        docs = self.get_all_json_docs(college_name)
-        print(f"  Found {len(docs)} documents for {college_name}")  # DEBUG
-        
-        if not docs:
-            return
-        
-        total_chunks_added = 0
+    def embed_texts_async(self, texts: List[str]) -> Callable[[], List[List[float]]]:
+        """Start embedding texts and return a function that waits for the vectors.
+
+        Cached vectors are reused. Misses are sent to the process pool right away when
+        one is configured, otherwise they are encoded here when the result is requested.
+        """
+        cache = self.embedding_cache
+        vectors: List[Any] = cache.get_many(texts) if cache is not None else [None] * len(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        missing_texts = [texts[i] for i in missing]
+        METRICS.incr("embed_cache_hits", len(texts) - len(missing))
+        METRICS.incr("embed_cache_misses", len(missing))
+        future = self.embedding_pool.submit(missing_texts) if self.embedding_pool and missing else None
+
+        def resolve() -> List[List[float]]:
+            if missing:
+                with METRICS.timer("embed"):
+                    computed = future.result() if future is not None else self.encode(missing_texts)
+                METRICS.incr("chunks_embedded", len(missing_texts))
+                if cache is not None:
+                    cache.put_many(missing_texts, computed)
+                for i, vector in zip(missing, computed):
+                    vectors[i] = vector
+            return [vector.tolist() for vector in vectors]
+
+        return resolve
+
+    def encode(self, texts: List[str]) -> Any:
+        """Run the SentenceTransformer over texts and return a float32 numpy array"""
+        return self.embedding_model.encode(
+            texts,
+            batch_size=self.embed_batch_size,
+            normalize_embeddings=self.normalize_embeddings,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+
+    def queue_chunks(self, ids: List[str], chunks: List[str], metadatas: List[Dict[str, str]]) -> None:
+        """Buffer chunks for embedding; flushes automatically when the buffer is full"""
+        self.pending_ids.extend(ids)
+        self.pending_chunks.extend(chunks)
+        self.pending_metadatas.extend(metadatas)
+        if len(self.pending_chunks) >= self.write_batch_size:
+            self.flush()
+
+    def flush(self) -> int:
+        """Embed all buffered chunks in one call and write them to ChromaDB in large batches"""
+        if not self.pending_chunks:
+            return 0
+
+        ids, chunks, metadatas = self.pending_ids, self.pending_chunks, self.pending_metadatas
+        self.pending_ids, self.pending_chunks, self.pending_metadatas = [], [], []
+        return self.write_chunks(ids, chunks, metadatas)
+
+    def write_chunks(
+        self,
+        ids: List[str],
+        chunks: List[str],
+        metadatas: List[Dict[str, str]],
+        resolve: Optional[Callable[[], List[List[float]]]] = None
+    ) -> int:
+        """Embed a batch of chunks (or wait for ``resolve``) and add it to ChromaDB.
+        Returns the number written."""
+        try:
+            embeddings = resolve() if resolve is not None else self.embed_texts(chunks)
+            # ChromaDB rejects writes larger than its configured max batch size
+            step = self.write_batch_size
+            if hasattr(self.client_chroma, "get_max_batch_size"):
+                step = min(step, self.client_chroma.get_max_batch_size())
+            for start in range(0, len(ids), step):
+                end = start + step
+                # upsert keeps re-runs idempotent: existing chunk IDs are overwritten
+                with METRICS.timer("vector_write"):
+                    self.collection.upsert(
+                        ids=ids[start:end],
+                        embeddings=embeddings[start:end],
+                        documents=chunks[start:end],
+                        metadatas=metadatas[start:end]
+                    )
+        except Exception as e:
+            self.failed_chunks += len(chunks)
+            METRICS.incr("chunks_failed", len(chunks))
+            logger.error("Error embedding/storing batch of %d chunks: %s", len(chunks), e)
+            return 0
+
+        self.total_chunks_written += len(chunks)
+        METRICS.incr("chunks_written", len(chunks))
+        logger.debug("Embedded and stored batch of %d chunks", len(chunks))
+        return len(chunks)
+
+    @staticmethod
+    def chunk_id(college_name: str, doc_id: str, index: int) -> str:
+        return f"{college_name}_{doc_id}_{index}"
+
+    def stored_chunk_state(self, college_name: str, doc_id: str) -> Optional[Tuple[str, int, bool]]:
+        """(content hash, total chunks, had duplicates) recorded on a document's chunks,
+        or None if it has none"""
+        existing = self.collection.get(
+            where={"$and": [{"college": college_name}, {"source": doc_id}]},
+            include=["metadatas"],
+            limit=1
+        )
+        if not existing["ids"]:
+            return None
+        metadata = existing["metadatas"][0] or {}
+        return (
+            str(metadata.get("content_hash", "")),
+            int(metadata.get("total_chunks", 0) or 0),
+            metadata.get("had_duplicates") == "1"
+        )
+
+    def delete_orphan_chunks(self, college_name: str, doc_id: str, keep: int, stored_total: int) -> int:
+        """Delete chunk IDs ``keep..stored_total-1`` left over from a longer previous version"""
+        if stored_total <= keep:
+            return 0
+        orphan_ids = [self.chunk_id(college_name, doc_id, i) for i in range(keep, stored_total)]
+        self.collection.delete(ids=orphan_ids)
+        METRICS.incr("chunks_deleted", len(orphan_ids))
+        logger.debug("Deleted %d stale chunks for %s", len(orphan_ids), doc_id)
+        return len(orphan_ids)
+
+    def prune_missing_sources(self, college_name: str, sources: Set[str]) -> int:
+        """Delete chunks of documents that no longer exist for a college. Returns sources removed."""
+        existing = self.collection.get(where={"college": college_name}, include=["metadatas"])
+        stale = {
+            (metadata or {}).get("source") for metadata in existing["metadatas"]
+        }.difference(sources)
+        stale.discard(None)
+        for source in stale:
+            self.collection.delete(where={"$and": [{"college": college_name}, {"source": source}]})
+        if stale:
+            METRICS.incr("docs_pruned", len(stale))
+            logger.debug("Removed chunks of %d deleted documents for %s", len(stale), college_name)
+        return len(stale)
+
+    def drop_duplicate_chunks(self, college_name: str, doc_id: str, chunks: List[str]) -> List[str]:
+        """Chunks that are not near-duplicates of one already kept for this college in this run.
+
+        Kept chunks are renumbered, so chunk IDs stay contiguous for sync mode.
+        """
+        seen = self.chunk_fingerprints.setdefault(college_name, SimHashIndex())
+        unique = [
+            chunk for i, chunk in enumerate(chunks)
+            if seen.add(self.chunk_id(college_name, doc_id, i), simhash(chunk)) is None
+        ]
+        self.duplicate_chunks += len(chunks) - len(unique)
+        METRICS.incr("chunks_duplicate", len(chunks) - len(unique))
+        return unique
+
+    def remember_chunks(self, college_name: str, doc_id: str, chunks: List[str]) -> None:
+        """Fingerprint the stored chunks of a document skipped as unchanged, so later
+        documents of the college are still deduplicated against them"""
+        seen = self.chunk_fingerprints.setdefault(college_name, SimHashIndex())
+        for i, chunk in enumerate(chunks):
+            seen.add(self.chunk_id(college_name, doc_id, i), simhash(chunk))
+
+    def prepare_chunks(
+        self,
+        college_name: str,
+        doc_id: str,
+        content: Any,
+        incremental: bool = False
+    ) -> Optional[ChunkBatch]:
+        """Turn one source document into (ids, chunks, metadatas), or None to skip it.
+
+        In incremental (sync) mode documents whose content hash matches the stored chunks
+        are skipped. For changed documents the new chunks overwrite the old IDs via upsert
+        and any IDs beyond the new chunk count are deleted.
+
+        With dedup, a document that lost chunks as near-duplicates of other documents is
+        re-chunked on every sync even when unchanged: the documents holding the kept copies
+        may have changed, and the text must not disappear from the store with them.
+        """
+        # Handle different possible content fields
+        text_content = ""
         
-        for doc_id, content in docs.items():
-            # Handle different possible content fields
-            text_content = ""
+        # Try different ways to extract text content
+        if isinstance(content, dict):
+            # Look for common text fields
+            for field in ["content", "text", "description", "data", "html_content"]:
+                if field in content:
+                    text_content = str(content[field])
+                    break
             
-            # Try different ways to extract text content
-            if isinstance(content, dict):
-                # Look for common text fields
-                for field in ["content", "text", "description", "data", "html_content"]:
-                    if field in content:
-                        text_content = str(content[field])
-                        break
-                
-                # If no specific text field, convert entire dict to string
-                if not text_content.strip():
-                    text_content = str(content)
-            else:
+            # If no specific text field, convert entire dict to string
+            if not text_content.strip():
                 text_content = str(content)
+        else:
+            text_content = str(content)
 
-            print(f"  Doc {doc_id}: {len(text_content)} chars")  # DEBUG
+        logger.debug("Doc %s: %d chars", doc_id, len(text_content))
 
-            if not text_content.strip() or len(text_content) < 10:
-                print(f"  Skipping {doc_id} - too short")  # DEBUG
-                continue
+        stored = self.stored_chunk_state(college_name, doc_id) if incremental else None
+        if not text_content.strip() or len(text_content) < 10:
+            METRICS.incr("docs_too_short")
+            logger.debug("Skipping %s - too short", doc_id)
+            if stored:
+                # The source still exists, so prune_missing_sources would keep its old chunks
+                self.delete_orphan_chunks(college_name, doc_id, 0, stored[1])
+            return None
+
+        doc_hash = ""
+        if isinstance(content, dict):
+            doc_hash = str(content.get("content_hash", ""))
+        if not doc_hash:
+            doc_hash = hashlib.sha256(text_content.encode("utf-8")).hexdigest()
+
+        if stored and stored[0] == doc_hash:
+            if not (self.dedup and stored[2]):
+                if self.dedup:
+                    # All of its chunks are stored, so chunking the source reproduces them
+                    with METRICS.timer("chunk"):
+                        self.remember_chunks(college_name, doc_id, self.chunk_text(text_content))
+                METRICS.incr("docs_unchanged")
+                logger.debug("Skipping %s - unchanged", doc_id)
+                return None
+            METRICS.incr("docs_rechecked")
+            logger.debug("Re-chunking %s - unchanged, but had near-duplicate chunks", doc_id)
+
+        with METRICS.timer("chunk"):
+            chunks: List[str] = self.chunk_text(text_content)
+        had_duplicates = False
+        if self.dedup:
+            unique = self.drop_duplicate_chunks(college_name, doc_id, chunks)
+            had_duplicates = len(unique) < len(chunks)
+            chunks = unique
+        if stored:
+            self.delete_orphan_chunks(college_name, doc_id, len(chunks), stored[1])
+        if not chunks:
+            logger.debug("No chunks created for %s", doc_id)
+            return None
+            
+        METRICS.incr("chunks_created", len(chunks))
+        logger.debug("Creating %d chunks for %s", len(chunks), doc_id)
+        ids: List[str] = [self.chunk_id(college_name, doc_id, i) for i in range(len(chunks))]
+        category = str(content.get("category", "")) if isinstance(content, dict) else ""
+        metadatas: List[Dict[str, str]] = [
+            {
+                "college": college_name, 
+                "source": doc_id,
+                "category": category,
+                "chunk_index": str(i),
+                "total_chunks": str(len(chunks)),
+                "content_hash": doc_hash,
+                "had_duplicates": "1" if had_duplicates else "0"
+            } 
+            for i in range(len(chunks))
+        ]
+        return ids, chunks, metadatas
+
+    def save_to_vector_db(self, college_name: str, incremental: bool = False, flush: bool = True) -> None:
+        """Stream all JSONs for a college and queue their chunks for ChromaDB.
 
+        With flush=False the chunks stay buffered so batches can span several colleges.
+        """
+        total_docs = 0
+        total_chunks_queued = 0
+        sources: Set[str] = set()
+        
+        for doc_id, content in self.iter_json_docs(college_name):
+            total_docs += 1
+            sources.add(doc_id)
             try:
-                chunks: List[str] = self.chunk_text(text_content)
-                if not chunks:
-                    print(f"  No chunks created for {doc_id}")  # DEBUG
-                    continue
-                    
-                print(f"  Creating {len(chunks)} chunks for {doc_id}")  # DEBUG
-                embeddings: List[List[float]] = [self.embed_text(chunk) for chunk in chunks]
-                ids: List[str] = [f"{college_name}_{doc_id}_{i}" for i in range(len(chunks))]
-                metadatas: List[Dict[str, str]] = [
-                    {
-                        "college": college_name, 
-                        "source": doc_id,
-                        "chunk_index": str(i),
-                        "total_chunks": str(len(chunks))
-                    } 
-                    for i in range(len(chunks))
-                ]
-
-                # Add to ChromaDB
-                self.collection.add(
-                    ids=ids,
-                    embeddings=embeddings,
-                    documents=chunks,
-                    metadatas=metadatas
-                )
-                
-                total_chunks_added += len(chunks)
-                print(f"  Added {len(chunks)} vectors for {doc_id}")  # DEBUG
-                
+                prepared = self.prepare_chunks(college_name, doc_id, content, incremental)
+                if prepared:
+                    self.queue_chunks(*prepared)
+                    total_chunks_queued += len(prepared[1])
             except Exception as e:
-                print(f"  Error processing {doc_id}: {e}")  # DEBUG
+                logger.warning("Error processing %s: %s", doc_id, e)
                 continue
         
-        print(f"  Total chunks added for {college_name}: {total_chunks_added}")  # DEBUG
+        logger.debug("Total chunks queued for %s: %d from %d documents",
+                     college_name, total_chunks_queued, total_docs)
+        if flush:
+            self.flush()
+        if incremental:
+            self.prune_missing_sources(college_name, sources)
 
+    def run(self, incremental: bool = False, colleges: Optional[List[str]] = None) -> None:
+        """Stream all colleges from the document source into the vector DB.
 
-    def run(self) -> None:
-        """Iterate over all colleges in Firestore and save to vector DB"""
-        colleges = self.get_all_colleges()
+        With ``incremental`` the collection is synced rather than appended to: unchanged
+        documents are skipped, changed ones are upserted with stale chunk IDs removed, and
+        chunks of documents that disappeared from the source are deleted.
+
+        Three stages connected by bounded queues: a fetch thread pages through the source,
+        a chunk thread builds write batches, and the calling thread embeds and writes them.
+        Memory stays bounded by the queue sizes and fetching overlaps with embedding.
+        Pass ``colleges`` to process only a subset.
+        """
+        colleges = self.get_all_colleges(colleges)
         
         if not colleges:
             return
         
         print(f"Processing {len(colleges)} colleges for vector database...")
-        
-        successful = 0
-        failed = 0
-        
-        for college_name in colleges:
+
+        doc_queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        # A couple of ready batches is enough to keep the embedding stage busy
+        batch_queue: "queue.Queue[Any]" = queue.Queue(maxsize=2)
+        college_errors: Dict[str, str] = {}
+        # Every document ID seen per college, used to prune chunks of deleted documents
+        sources: Dict[str, Set[str]] = {college_name: set() for college_name in colleges}
+
+        def fetch_stage() -> None:
+            try:
+                for college_name in colleges:
+                    try:
+                        count = 0
+                        for doc_id, content in self.iter_json_docs(college_name):
+                            doc_queue.put((college_name, doc_id, content))
+                            sources[college_name].add(doc_id)
+                            count += 1
+                            METRICS.incr("docs_fetched")
+                            METRICS.gauge("doc_queue_depth", doc_queue.qsize())
+                        logger.debug("Fetched %d documents for %s", count, college_name)
+                    except Exception as e:
+                        college_errors[college_name] = str(e)
+                        logger.error("Error fetching %s: %s", college_name, e)
+            finally:
+                doc_queue.put(_END)
+
+        def chunk_stage() -> None:
+            ids: List[str] = []
+            chunks: List[str] = []
+            metadatas: List[Dict[str, str]] = []
             try:
-                self.save_to_vector_db(college_name)
-                successful += 1
+                while True:
+                    item = doc_queue.get()
+                    if item is _END:
+                        break
+                    college_name, doc_id, content = item
+                    try:
+                        prepared = self.prepare_chunks(college_name, doc_id, content, incremental)
+                    except Exception as e:
+                        logger.warning("Error processing %s: %s", doc_id, e)
+                        continue
+                    if not prepared:
+                        continue
+                    ids.extend(prepared[0])
+                    chunks.extend(prepared[1])
+                    metadatas.extend(prepared[2])
+                    if len(chunks) >= self.write_batch_size:
+                        batch_queue.put((ids, chunks, metadatas))
+                        METRICS.gauge("batch_queue_depth", batch_queue.qsize())
+                        ids, chunks, metadatas = [], [], []
+                if chunks:
+                    batch_queue.put((ids, chunks, metadatas))
             except Exception as e:
-                failed += 1
+                logger.error("Chunking stage failed: %s", e)
+                # Drain so the fetch stage is never left blocked on a full queue
+                while doc_queue.get() is not _END:
+                    pass
+            finally:
+                batch_queue.put(_END)
+
+        threads = [
+            threading.Thread(target=fetch_stage, name="source-fetch", daemon=True),
+            threading.Thread(target=chunk_stage, name="chunker", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        # With a process pool several batches are embedded at once while this thread
+        # writes finished ones to ChromaDB in submission order
+        max_in_flight = 2 * self.embedding_pool.processes if self.embedding_pool else 0
+        in_flight: Deque[Tuple[ChunkBatch, Callable[[], List[List[float]]]]] = deque()
+        while True:
+            batch = batch_queue.get()
+            if batch is _END:
+                break
+            if not self.embedding_pool:
+                self.write_chunks(*batch)
                 continue
+            in_flight.append((batch, self.embed_texts_async(batch[1])))
+            METRICS.gauge("embed_batches_in_flight", len(in_flight))
+            while len(in_flight) >= max_in_flight:
+                done, resolve = in_flight.popleft()
+                self.write_chunks(*done, resolve=resolve)
+
+        while in_flight:
+            done, resolve = in_flight.popleft()
+            self.write_chunks(*done, resolve=resolve)
+
+        for thread in threads:
+            thread.join()
+
+        # Anything queued through save_to_vector_db() by other callers
+        self.flush()
+
+        if incremental:
+            for college_name in colleges:
+                if college_name not in college_errors:
+                    try:
+                        self.prune_missing_sources(college_name, sources[college_name])
+                    except Exception as e:
+                        logger.error("Error pruning %s: %s", college_name, e)
+
+        failed = len(college_errors)
+        successful = len(colleges) - failed
         
         total_vectors = self.collection.count()
         print(f"Completed: {successful} successful, {failed} failed, {total_vectors} total vectors stored")
+        print(f"Chunks written this run: {self.total_chunks_written}, failed: {self.failed_chunks}")
+        if self.dedup:
+            print(f"Near-duplicate chunks dropped: {self.duplicate_chunks}")
+        if self._embedding_cache is not None:
+            print(f"Embedding cache: {self._embedding_cache.hits} hits, {self._embedding_cache.misses} misses")
+
+    def close(self) -> None:
+        """Shut down the embedding process pool and cache, if they were started"""
+        if self._embedding_pool:
+            self._embedding_pool.close()
+            self._embedding_pool = None
+        if self._embedding_cache is not None:
+            self._embedding_cache.close()
+            self._embedding_cache = None
@@ -1,6 +1,7 @@
 import asyncio
 from playwright.async_api import async_playwright
 import argparse
+import logging
 import random
 import json
 import time
@@ -8,24 +9,99 @@ import os
 import re
 from urllib.parse import urlparse, urljoin
 
-async def scrape(base_url, out_folder, headless=True, proxy=None, max_pages=50, delay_min=1, delay_max=3):
+from crawl_frontier import CrawlFrontier
+from html_extract import extract_page
+from crawl_checkpoint import (
+    checkpoint_path, save_checkpoint, load_checkpoint,
+    manifest_path, CrawlManifest, content_hash,
+    dead_letter_path, save_dead_letters
+)
+from crawl_archive import CrawlArchive
+from rate_limiter import (
+    AdaptiveRateLimiter, RetryQueue, FetchError,
+    RETRYABLE_STATUSES, host_of, is_throttle, is_retryable_status
+)
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/118.0.0.0 Safari/537.36"
+)
+VIEWPORT = {"width": 1366, "height": 768}
+
+# Resource types and hosts aborted in --fast mode; page text never depends on them
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+BLOCKED_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "adservice.google.com", "amazon-adsystem.com", "facebook.net",
+    "connect.facebook.com", "hotjar.com", "clarity.ms", "criteo.com", "taboola.com",
+    "outbrain.com", "moengage.com", "webengage.com", "onesignal.com"
+)
+
+# A static (non-rendered) fetch is only trusted when it already carries this much text
+MIN_STATIC_TEXT_CHARS = 1500
+
+# Checkpoint, manifest and archive index are rewritten every this many pages (and at the end);
+# a killed crawl re-fetches at most this many pages on --resume
+CHECKPOINT_EVERY = 10
+
+# Categories fetched first when --prioritize is set and --max-pages truncates the crawl
+HIGH_VALUE_CATEGORIES = ("admission", "cutoff", "fees", "placements")
+
+async def scrape(base_url, out_folder, headless=True, proxy=None, max_pages=50, delay_min=1, delay_max=3,
+                 workers=1, prioritize=False, resume=False, incremental=False,
+                 fast=False, http_fallback=False, output_format="json",
+                 adaptive_rate=False, min_rate=0.1, max_rate=5.0, max_retries=3):
+    rate_limiter = None
+    if adaptive_rate:
+        rate_limiter = make_rate_limiter(workers, delay_min, delay_max, min_rate, max_rate)
     async with async_playwright() as p:
-        launch_args = {"headless": headless}
-        if proxy:
-            launch_args["proxy"] = {"server": proxy}
-
-        browser = await p.chromium.launch(**launch_args)
-
-        context = await browser.new_context(
-            user_agent=(
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/118.0.0.0 Safari/537.36"
-            ),
-            viewport={"width": 1366, "height": 768}
+        browser = await launch_browser(p, headless=headless, proxy=proxy)
+        await crawl_college(
+            browser, base_url, out_folder,
+            max_pages=max_pages, delay_min=delay_min, delay_max=delay_max, workers=workers,
+            prioritize=prioritize, resume=resume, incremental=incremental,
+            fast=fast, http_fallback=http_fallback, output_format=output_format,
+            rate_limiter=rate_limiter, max_retries=max_retries
         )
+        await browser.close()
+
+async def launch_browser(p, headless=True, proxy=None):
+    """Launch the Chromium instance used by one or more college crawls"""
+    launch_args = {"headless": headless}
+    if proxy:
+        launch_args["proxy"] = {"server": proxy}
+    return await p.chromium.launch(**launch_args)
+
+def make_rate_limiter(workers, delay_min, delay_max, min_rate, max_rate):
+    """Adaptive limiter starting at the rate the fixed delays would give (workers / mean delay)"""
+    mean_delay = max((delay_min + delay_max) / 2, 0.01)
+    initial_rate = min(max_rate, max(min_rate, max(1, workers) / mean_delay))
+    return AdaptiveRateLimiter(initial_rate=initial_rate, min_rate=min_rate, max_rate=max_rate)
+
+async def crawl_college(browser, base_url, out_folder, max_pages=50, delay_min=1, delay_max=3,
+                        workers=1, prioritize=False, resume=False, incremental=False,
+                        fast=False, http_fallback=False, output_format="json",
+                        rate_limiter=None, max_retries=3):
+    """Crawl one college in its own browser context and return the number of pages scraped.
+
+    Without a rate_limiter every worker sleeps delay_min..delay_max after a page;
+    with one, requests are paced per host by the limiter instead. Failed pages are
+    retried with exponential backoff up to max_retries times, then written to the
+    college's dead-letter report.
+    """
+    context = await browser.new_context(user_agent=USER_AGENT, viewport=VIEWPORT)
+    archive = None
+    try:
+        if fast:
+            await context.route("**/*", block_non_essential)
 
-        page = await context.new_page()
+        # One page per worker; all workers share the same frontier
+        workers = max(1, workers)
+        pages = [await context.new_page() for _ in range(workers)]
 
         # Extract university base URL and college name
         university_base = extract_university_base(base_url)
@@ -38,71 +114,297 @@ async def scrape(base_url, out_folder, headless=True, proxy=None, max_pages=50,
         college_folder = os.path.join(out_folder, college_name)
         os.makedirs(college_folder, exist_ok=True)
         print(f"Main folder: {college_folder}")
+        # jsonl: one compressed append-only archive per college instead of a file per page
+        if output_format == "jsonl":
+            archive = CrawlArchive(college_folder)
+
+        priority = category_priority if prioritize else None
+        checkpoint_file = checkpoint_path(out_folder, college_name)
+        checkpoint = load_checkpoint(checkpoint_file) if resume else None
+        # Pages given up on in earlier sessions, by URL, until they succeed or fail again
+        carried_dead_letters = {}
+        # Failed pages are queued again first, the site may have recovered since; a 404 stays a 404
+        retry_failed = [
+            entry for entry in (checkpoint or {}).get("dead_letters", [])
+            if is_retryable_status(entry.get("status"))
+        ]
+        if checkpoint and checkpoint.get("finished"):
+            # A completed crawl has nothing left to resume: crawl the college again from the start,
+            # plus the pages that failed last time
+            carried_dead_letters = {entry["url"]: entry for entry in retry_failed}
+            checkpoint = None
+            print(f"Previous crawl in {checkpoint_file} finished, starting a new one "
+                  f"({len(carried_dead_letters)} failed pages queued again)")
+        if checkpoint:
+            # Non-retryable failures stay in the report but are not fetched again
+            carried_dead_letters = {entry["url"]: entry for entry in checkpoint.get("dead_letters", [])}
+            pending = [entry["url"] for entry in retry_failed] + checkpoint.get("pending", [])
+            state = dict(checkpoint, pending=pending)
+            frontier = CrawlFrontier.from_state(state, priority=priority)
+            scraped_count = checkpoint.get("scraped_count", 0)
+            print(f"Resuming from {checkpoint_file}: {scraped_count} pages done, {len(frontier)} queued "
+                  f"({len(retry_failed)} failed before)")
+        else:
+            frontier = CrawlFrontier(priority=priority)
+            frontier.add(base_url)
+            for url in carried_dead_letters:
+                frontier.add(url)
+            scraped_count = 0
+        in_flight = 0
+        in_flight_urls = set()
+        retries = RetryQueue(max_retries=max_retries)
+
+        # The manifest is always recorded so the next run can be incremental
+        manifest = CrawlManifest(manifest_path(out_folder, college_name))
+        page_stats = {"new": 0, "changed": 0, "unchanged": 0}
+
+        def dead_letters():
+            return list(carried_dead_letters.values()) + retries.dead_letters
+
+        def write_checkpoint(finished=False):
+            # URLs waiting for a retry go back to the front of the queue on --resume
+            state = frontier.to_state(in_flight=in_flight_urls | retries.urls())
+            state.update(base_url=base_url, scraped_count=scraped_count, finished=finished,
+                         dead_letters=dead_letters())
+            save_checkpoint(checkpoint_file, state)
+            manifest.save()
+            if archive:
+                archive.save_index()
+
+        async def worker(worker_id, page):
+            nonlocal scraped_count, in_flight
+            tag = f"[W{worker_id}] " if workers > 1 else ""
+
+            while scraped_count < max_pages:
+                # Retries whose backoff has elapsed go first, then new URLs from the frontier
+                retry = retries.pop_ready() if scraped_count + in_flight < max_pages else None
+                # Wait for in-flight pages when the frontier is empty (they may add links),
+                # for pending retries, or when the remaining page budget is already claimed
+                if retry is None and (not frontier or scraped_count + in_flight >= max_pages):
+                    if in_flight == 0 and not retries:
+                        break
+                    await asyncio.sleep(0.1)
+                    continue
+
+                url, attempt = retry if retry else (frontier.pop(), 0)
+                host = host_of(url)
+                in_flight += 1
+                in_flight_urls.add(url)
+                METRICS.gauge("crawl_pages_in_flight", in_flight)
+                METRICS.gauge("crawl_frontier_size", len(frontier))
+                try:
+                    if rate_limiter:
+                        with METRICS.timer("crawl_rate_wait"):
+                            await rate_limiter.acquire(host)
+                    logger.info("%s[%d/%d] Visiting: %s", tag, scraped_count + in_flight, max_pages, url)
+                    with METRICS.timer("crawl_page"):
+                        links, status = await scrape_page(
+                            page, url, university_base, college_folder, tag=tag, manifest=manifest,
+                            incremental=incremental, fast=fast, http_fallback=http_fallback, archive=archive
+                        )
+                    scraped_count += 1
+                    carried_dead_letters.pop(url, None)
+                    page_stats[status] += 1
+                    METRICS.incr(f"crawl_pages_{status}")
+                    if rate_limiter:
+                        rate_limiter.record_success(host)
+                        METRICS.gauge("crawl_rate", rate_limiter.rate(host))
+                except Exception as e:
+                    # Errors stay isolated to this URL; it is retried later or dead-lettered
+                    METRICS.incr("crawl_errors")
+                    if rate_limiter and is_throttle(e):
+                        rate_limiter.record_throttle(host, getattr(e, "retry_after", None))
+                        METRICS.incr("crawl_throttled")
+                        METRICS.gauge("crawl_rate", rate_limiter.rate(host))
+                        logger.debug("%sSlowing down %s to %.2f pages/s", tag, host, rate_limiter.rate(host))
+                    delay = retries.schedule(url, attempt + 1, e)
+                    if delay is None:
+                        carried_dead_letters.pop(url, None)
+                        METRICS.incr("crawl_dead_letters")
+                        logger.warning("%sGiving up on %s after %d attempt(s): %s", tag, url, attempt + 1, e)
+                    else:
+                        METRICS.incr("crawl_retries")
+                        logger.warning("%sError while processing %s (retry in %.0fs): %s", tag, url, delay, e)
+                    continue
+                finally:
+                    in_flight -= 1
+                    in_flight_urls.discard(url)
 
-        visited = set()
-        to_visit = [base_url]
-        scraped_count = 0
-
-        while to_visit and scraped_count < max_pages:
-            url = to_visit.pop(0)
-            if url in visited:
-                continue
-            visited.add(url)
-
-            try:
-                print(f"[{scraped_count+1}/{max_pages}] Visiting: {url}")
-                await page.goto(url, wait_until="networkidle", timeout=60000)
-
-                # Scroll to trigger lazy-loaded content
-                await page.mouse.wheel(0, 2000)
-                await page.wait_for_timeout(2000)
-
-                # Extract text content
-                text = await page.inner_text("body")
-                
-                # Get page title
-                title = await page.title()
-
-                # Get filename with category prefix
-                filename = generate_filename(url, university_base)
-                filepath = os.path.join(college_folder, filename)
-                category = detect_category(url)
-
-                # Prepare data
-                page_data = {
-                    "url": url,
-                    "title": title,
-                    "content": text,
-                    "category": category,
-                    "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S")
-                }
-
-                # Save to JSON file in main folder
-                with open(filepath, "w", encoding="utf-8") as f:
-                    json.dump(page_data, f, indent=2, ensure_ascii=False)
-                
-                print(f"   Saved to: {filename}")
-                scraped_count += 1
-
-                # Collect links for further crawling - only university-specific pages
-                links = await page.eval_on_selector_all("a", "elements => elements.map(e => e.href)")
                 for link in links:
-                    if link and is_university_page(link, university_base):
-                        if link not in visited and link not in to_visit:
-                            to_visit.append(link)
-                            link_category = detect_category(link)
-                            print(f"   Found {link_category} page: {link}")
+                    if frontier.add(link):
+                        logger.debug("   Found %s page: %s", detect_category(link), link)
+
+                # Persist progress so a killed crawl can continue with --resume
+                if scraped_count % CHECKPOINT_EVERY == 0:
+                    with METRICS.timer("crawl_checkpoint"):
+                        write_checkpoint()
 
-                # Random delay to avoid detection
-                time.sleep(random.uniform(delay_min, delay_max))
+                # Random delay to avoid detection (the rate limiter paces requests instead)
+                if not rate_limiter:
+                    await asyncio.sleep(random.uniform(delay_min, delay_max))
 
-            except Exception as e:
-                print(f"Error while processing {url}: {e}")
+        await asyncio.gather(*(worker(i + 1, page) for i, page in enumerate(pages)))
+        write_checkpoint(finished=True)
+        # Earlier failures that were not retried this session (page budget used up) stay in the report
+        failed = dead_letters()
+        dead_letter_file = dead_letter_path(out_folder, college_name)
+        if failed or os.path.exists(dead_letter_file):
+            save_dead_letters(dead_letter_file, base_url, failed)
 
         print(f"\n✅ Crawling finished. Pages scraped: {scraped_count}")
+        print(f"   New: {page_stats['new']}, changed: {page_stats['changed']}, unchanged: {page_stats['unchanged']}")
+        if failed:
+            print(f"   Failed: {len(failed)} (see {dead_letter_file})")
         print(f"All files saved in: {college_folder}")
 
-        await browser.close()
+        return scraped_count
+    finally:
+        if archive:
+            archive.close()
+        await context.close()
+
+async def block_non_essential(route):
+    """Route handler for --fast mode: abort images, media, fonts and ad/analytics hosts"""
+    request = route.request
+    host = urlparse(request.url).hostname or ""
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(
+        host == blocked or host.endswith("." + blocked) for blocked in BLOCKED_HOSTS
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def render_page(page, url, fast=False):
+    """Load a page in the browser and return (title, text, links, response headers)"""
+    if fast:
+        # Wait for the DOM plus visible body text instead of full network idle and a fixed pause
+        response = await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        raise_for_status(url, response)
+        try:
+            await page.wait_for_function(
+                "document.body && document.body.innerText.trim().length > 200", timeout=10000
+            )
+        except Exception:
+            pass
+        await page.mouse.wheel(0, 2000)
+        try:
+            await page.wait_for_load_state("networkidle", timeout=3000)
+        except Exception:
+            pass
+    else:
+        response = await page.goto(url, wait_until="networkidle", timeout=60000)
+        raise_for_status(url, response)
+
+        # Scroll to trigger lazy-loaded content
+        await page.mouse.wheel(0, 2000)
+        await page.wait_for_timeout(2000)
+
+    # Extract text content
+    text = await page.inner_text("body")
+    
+    # Get page title
+    title = await page.title()
+
+    links = await page.eval_on_selector_all("a", "elements => elements.map(e => e.href)")
+    return title, text, links, response.headers if response else {}
+
+def raise_for_status(url, response):
+    """Raise FetchError for an HTTP error page instead of saving it as content"""
+    if response and response.status >= 400:
+        raise FetchError.from_response(url, response.status, response.headers)
+
+async def fetch_static(page, url):
+    """Fetch a page over plain HTTP and return (title, text, links, headers),
+    or None when the HTML looks like it needs JavaScript rendering"""
+    response = await page.context.request.get(url, timeout=30000)
+    # Rendering would hit the same rate limit or server error, so fail the attempt instead
+    if response.status in RETRYABLE_STATUSES:
+        raise FetchError.from_response(url, response.status, response.headers)
+    if not response.ok or "html" not in response.headers.get("content-type", ""):
+        return None
+    title, text, links = extract_page(await response.text(), url)
+    if len(text) < MIN_STATIC_TEXT_CHARS:
+        return None
+    return title, text, links, response.headers
+
+async def scrape_page(page, url, university_base, college_folder, tag="", manifest=None, incremental=False,
+                      fast=False, http_fallback=False, archive=None):
+    """Fetch a page, save it as JSON (or append it to the archive) and return (university links, status).
+
+    Status is "new", "changed" or "unchanged". In incremental mode a page whose
+    ETag/Last-Modified still validate is not rendered at all, and a page whose
+    content hash matches the manifest is not rewritten. With http_fallback a plain
+    HTTP fetch is tried first and the browser is only used for JS-dependent pages.
+    """
+    filename = generate_filename(url, university_base)
+    filepath = os.path.join(college_folder, filename)
+    previous = manifest.get(url) if manifest else None
+    output_exists = archive.has(url) if archive else os.path.exists(filepath)
+
+    # Cheap revalidation with HTTP validators before paying for a full render
+    if incremental and previous and output_exists and previous.get("links") is not None:
+        headers = manifest.conditional_headers(url)
+        if headers:
+            with METRICS.timer("crawl_revalidate"):
+                response = await page.context.request.get(url, headers=headers, timeout=30000)
+            if response.status in RETRYABLE_STATUSES:
+                raise FetchError.from_response(url, response.status, response.headers)
+            etag = response.headers.get("etag")
+            if response.status == 304 or (etag and etag == previous.get("etag")):
+                logger.debug("   %sNot modified: %s", tag, filename)
+                return previous["links"], "unchanged"
+
+    fetched = None
+    if http_fallback:
+        with METRICS.timer("crawl_fetch_static"):
+            fetched = await fetch_static(page, url)
+        METRICS.incr("crawl_static_hits" if fetched is not None else "crawl_static_misses")
+    if fetched is None:
+        with METRICS.timer("crawl_render"):
+            fetched = await render_page(page, url, fast)
+    title, text, links, response_headers = fetched
+
+    # Collect links for further crawling - only university-specific pages
+    links = [link for link in links if link and is_university_page(link, university_base)]
+
+    page_hash = content_hash(title, text)
+    if manifest:
+        manifest.update(
+            url,
+            content_hash=page_hash,
+            etag=response_headers.get("etag"),
+            last_modified=response_headers.get("last-modified"),
+            filename=filename,
+            links=links
+        )
+
+    if incremental and previous and output_exists and previous.get("content_hash") == page_hash:
+        logger.debug("   %sUnchanged: %s", tag, filename)
+        return links, "unchanged"
+
+    category = detect_category(url)
+
+    # Prepare data
+    page_data = {
+        "url": url,
+        "title": title,
+        "content": text,
+        "category": category,
+        "content_hash": page_hash,
+        "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+    if archive:
+        doc_id = archive.append(filename, page_data)
+        logger.debug("   %sArchived as: %s", tag, doc_id)
+        return links, "changed" if previous else "new"
+
+    # Save to JSON file in main folder
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(page_data, f, indent=2, ensure_ascii=False)
+    
+    logger.debug("   %sSaved to: %s", tag, filename)
+    return links, "changed" if previous else "new"
 
 def detect_category(url):
     """Detect the category of the page from URL"""
@@ -138,6 +440,10 @@ def detect_category(url):
     else:
         return "profile"
 
+def category_priority(url):
+    """Frontier tier for a URL: high-value categories first, everything else after"""
+    return 0 if detect_category(url) in HIGH_VALUE_CATEGORIES else 1
+
 def generate_filename(url, university_base):
     """Generate a descriptive filename with category prefix"""
     category = detect_category(url)
@@ -226,8 +532,26 @@ if __name__ == "__main__":
     parser.add_argument("--max-pages", default=50, type=int, help="Maximum pages to scrape")
     parser.add_argument("--delay-min", default=1, type=float, help="Minimum delay between requests")
     parser.add_argument("--delay-max", default=3, type=float, help="Maximum delay between requests")
+    parser.add_argument("--workers", default=1, type=int, help="Number of pages crawled concurrently")
+    parser.add_argument("--prioritize", action="store_true", help="Crawl admission, cutoff, fees and placement pages first")
+    parser.add_argument("--resume", action="store_true", help="Continue an unfinished crawl from the college's checkpoint file")
+    parser.add_argument("--incremental", action="store_true", help="Skip pages that are unchanged since the last crawl")
+    parser.add_argument("--fast", action="store_true", help="Block images/fonts/media/trackers and wait for content instead of fixed delays")
+    parser.add_argument("--http-fallback", action="store_true", help="Use a plain HTTP fetch for pages that do not need JS rendering")
+    parser.add_argument("--format", default="json", choices=["json", "jsonl"],
+                        help="json: one file per page; jsonl: one compressed archive per college")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="DEBUG also shows discovered links and saved files")
+    parser.add_argument("--metrics-out", default=None,
+                        help="Write crawl metrics to this file (Prometheus text for *.prom, JSON otherwise)")
+    parser.add_argument("--adaptive-rate", action="store_true",
+                        help="Pace requests per host, speeding up on healthy responses and backing off on 429/5xx/timeouts")
+    parser.add_argument("--min-rate", default=0.1, type=float, help="Lowest request rate per host (pages/s) with --adaptive-rate")
+    parser.add_argument("--max-rate", default=5.0, type=float, help="Highest request rate per host (pages/s) with --adaptive-rate")
+    parser.add_argument("--max-retries", default=3, type=int, help="Retries per failed page before it goes to the dead-letter report")
 
     args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(message)s")
 
     asyncio.run(scrape(
         base_url=args.base,
@@ -236,5 +560,19 @@ if __name__ == "__main__":
         proxy=args.proxy,
         max_pages=args.max_pages,
         delay_min=args.delay_min,
-        delay_max=args.delay_max
+        delay_max=args.delay_max,
+        workers=args.workers,
+        prioritize=args.prioritize,
+        resume=args.resume,
+        incremental=args.incremental,
+        fast=args.fast,
+        http_fallback=args.http_fallback,
+        output_format=args.format,
+        adaptive_rate=args.adaptive_rate,
+        min_rate=args.min_rate,
+        max_rate=args.max_rate,
+        max_retries=args.max_retries
     ))
+    print(METRICS.summary())
+    if args.metrics_out:
+        METRICS.write(args.metrics_out)
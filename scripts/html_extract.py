@@ -0,0 +1,64 @@
+import re
+from html.parser import HTMLParser
+from typing import List, Tuple
+from urllib.parse import urljoin
+
+# Elements whose text never shows up in the rendered page
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+# Elements that start a new line in innerText
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "header", "footer", "nav", "aside", "main",
+    "li", "ul", "ol", "tr", "table", "br", "h1", "h2", "h3", "h4", "h5", "h6",
+}
+
+BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+class _TextAndLinksParser(HTMLParser):
+    def __init__(self, base_url: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.parts: List[str] = []
+        self.links: List[str] = []
+        self.title_parts: List[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title" and not self._skip_depth:
+            self._in_title = True
+        elif tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "a":
+            href = dict(attrs).get("href")
+            if href and not href.startswith(("javascript:", "mailto:", "tel:", "#")):
+                self.links.append(urljoin(self.base_url, href))
+        if tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        if tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title_parts.append(data)
+        elif not self._skip_depth:
+            self.parts.append(data)
+
+
+def extract_page(html: str, base_url: str) -> Tuple[str, str, List[str]]:
+    """Return (title, visible text, absolute links) from raw HTML without a browser."""
+    parser = _TextAndLinksParser(base_url)
+    parser.feed(html)
+    parser.close()
+
+    text = "".join(parser.parts)
+    text = "\n".join(line.strip() for line in text.splitlines())
+    text = BLANK_LINES.sub("\n", text).strip()
+    title = " ".join("".join(parser.title_parts).split())
+    return title, text, parser.links
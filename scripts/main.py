@@ -1,9 +1,73 @@
+import json
+import logging
+import argparse
 from firestore_to_vectordb import FirestoreToVectorDB
+from document_sources import LocalFolderSource
+from metrics import METRICS
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "status"],
+                        help="run: vectorize the document source (default); status: print vector counts and exit")
+    parser.add_argument("--persist-dir", default="./chroma_db", help="ChromaDB storage folder")
+    parser.add_argument("--incremental", "--sync", dest="incremental", action="store_true",
+                        help="Sync mode: re-embed only changed documents and delete stale chunks")
+    parser.add_argument("--embed-batch-size", default=64, type=int, help="Texts per SentenceTransformer forward pass")
+    parser.add_argument("--write-batch-size", default=1024, type=int, help="Chunks buffered before embedding and writing")
+    parser.add_argument("--normalize", action="store_true", help="L2-normalize embeddings")
+    parser.add_argument("--cache-path", default="./embedding_cache.sqlite", help="On-disk embedding cache file")
+    parser.add_argument("--cache-max-entries", default=500_000, type=int, help="Cached vectors kept before LRU eviction")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the embedding cache")
+    parser.add_argument("--page-size", default=300, type=int, help="Firestore documents fetched per page")
+    parser.add_argument("--queue-size", default=256, type=int, help="Documents buffered between fetch and chunking")
+    parser.add_argument("--colleges", nargs="+", default=None, help="Only vectorize these college IDs")
+    parser.add_argument("--colleges-cache", default=None, help="File caching the discovered college list")
+    parser.add_argument("--colleges-cache-ttl", default=3600, type=float, help="Seconds before the college list is re-discovered")
+    parser.add_argument("--max-chunk-tokens", default=None, type=int, help="Tokens per chunk (default: model window)")
+    parser.add_argument("--overlap-tokens", default=32, type=int, help="Tokens shared by consecutive chunks")
+    parser.add_argument("--embed-workers", default=0, type=int, help="Embedding processes (0 = embed in this process)")
+    parser.add_argument("--torch-threads", default=None, type=int, help="Torch threads per embedding process")
+    parser.add_argument("--source", default="firestore", choices=["firestore", "local"],
+                        help="Read documents from Firestore or straight from scraped JSON on disk")
+    parser.add_argument("--local-dir", default="./scraped_data", help="Scraped data folder used with --source local")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Skip near-duplicate chunks (and, with --source local, boilerplate lines and pages)")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="DEBUG shows per-document and per-batch messages")
+    parser.add_argument("--metrics-out", default=None,
+                        help="Write run metrics to this file (Prometheus text for *.prom, JSON otherwise)")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(message)s")
+
     try:
-        vectorizer = FirestoreToVectorDB(persist_dir="./chroma_db")
-        vectorizer.run()
+        vectorizer = FirestoreToVectorDB(
+            persist_dir=args.persist_dir,
+            embed_batch_size=args.embed_batch_size,
+            write_batch_size=args.write_batch_size,
+            normalize_embeddings=args.normalize,
+            cache_path=None if args.no_cache else args.cache_path,
+            cache_max_entries=args.cache_max_entries,
+            page_size=args.page_size,
+            queue_size=args.queue_size,
+            colleges_cache_path=args.colleges_cache,
+            colleges_cache_ttl=args.colleges_cache_ttl,
+            max_chunk_tokens=args.max_chunk_tokens,
+            overlap_tokens=args.overlap_tokens,
+            embed_workers=args.embed_workers,
+            torch_threads=args.torch_threads,
+            source=LocalFolderSource(args.local_dir, dedup=args.dedup) if args.source == "local" else None,
+            dedup=args.dedup
+        )
+        try:
+            if args.command == "status":
+                print(json.dumps(vectorizer.status(args.colleges), indent=2))
+            else:
+                vectorizer.run(incremental=args.incremental, colleges=args.colleges)
+                print(METRICS.summary())
+        finally:
+            vectorizer.close()
+            if args.metrics_out:
+                METRICS.write(args.metrics_out)
         
     except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
@@ -0,0 +1,125 @@
+import re
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+
+class Metrics:
+    """Thread-safe counters, gauges and timers for one pipeline run.
+
+    Counters only grow (pages, chunks, Firestore round trips), gauges hold the last
+    and peak value of something sampled (queue depths, pages in flight) and timers
+    record count/total/max seconds of a stage. ``snapshot()`` is plain JSON;
+    ``to_prometheus()`` renders the text exposition format.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, Dict[str, float]] = {}
+        self.timers: Dict[str, Dict[str, float]] = {}
+        self.lock = threading.Lock()
+
+    def incr(self, name: str, amount: float = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name: str, value: float) -> None:
+        with self.lock:
+            entry = self.gauges.setdefault(name, {"value": value, "max": value})
+            entry["value"] = value
+            entry["max"] = max(entry["max"], value)
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self.lock:
+            entry = self.timers.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.started = time.monotonic()
+            self.counters.clear()
+            self.gauges.clear()
+            self.timers.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                "elapsed_seconds": round(elapsed, 3),
+                "counters": dict(self.counters),
+                "rates_per_second": {
+                    name: round(value / elapsed, 3) for name, value in self.counters.items()
+                } if elapsed > 0 else {},
+                "gauges": {name: dict(entry) for name, entry in self.gauges.items()},
+                "timers": {
+                    name: dict(entry, avg=entry["total"] / entry["count"] if entry["count"] else 0.0)
+                    for name, entry in self.timers.items()
+                },
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix: str = "procounsel") -> str:
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        def metric(name: str, suffix: str = "") -> str:
+            return re.sub(r"[^a-zA-Z0-9_]", "_", f"{prefix}_{name}{suffix}")
+
+        for name, value in sorted(snapshot["counters"].items()):
+            lines += [f"# TYPE {metric(name, '_total')} counter", f"{metric(name, '_total')} {value}"]
+        for name, entry in sorted(snapshot["gauges"].items()):
+            lines += [f"# TYPE {metric(name)} gauge", f"{metric(name)} {entry['value']}"]
+            lines += [f"# TYPE {metric(name, '_max')} gauge", f"{metric(name, '_max')} {entry['max']}"]
+        for name, entry in sorted(snapshot["timers"].items()):
+            base = metric(name, "_seconds")
+            lines += [
+                f"# TYPE {base} summary",
+                f"{base}_count {entry['count']}",
+                f"{base}_sum {entry['total']:.6f}",
+                f"# TYPE {base}_max gauge",
+                f"{base}_max {entry['max']:.6f}",
+            ]
+        lines.append(f"{metric('elapsed_seconds')} {snapshot['elapsed_seconds']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Dump metrics to ``path``: Prometheus text for *.prom, JSON otherwise."""
+        body = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(body)
+
+    def summary(self) -> str:
+        """Human-readable run summary: stage timings, throughput and peak gauges."""
+        snapshot = self.snapshot()
+        elapsed = snapshot["elapsed_seconds"]
+        lines = [f"Run summary ({elapsed:.1f}s)"]
+        for name, entry in sorted(snapshot["timers"].items()):
+            lines.append(
+                f"  {name}: {entry['count']} x avg {entry['avg'] * 1000:.1f} ms, "
+                f"max {entry['max'] * 1000:.1f} ms, total {entry['total']:.1f}s"
+            )
+        for name, value in sorted(snapshot["counters"].items()):
+            rate = snapshot["rates_per_second"].get(name, 0)
+            lines.append(f"  {name}: {value:g} ({rate:.2f}/s)")
+        for name, entry in sorted(snapshot["gauges"].items()):
+            lines.append(f"  {name}: last {entry['value']:g}, peak {entry['max']:g}")
+        return "\n".join(lines)
+
+
+# Shared by every stage in the process; entry points print or write it at the end
+METRICS = Metrics()
@@ -0,0 +1,206 @@
+import json
+import queue
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import chromadb
+from sentence_transformers import SentenceTransformer
+
+from firestore_to_vectordb import EMBEDDING_MODEL, COLLECTION_NAME
+
+
+class LRUCache:
+    """Small thread-safe LRU map used for hot query embeddings."""
+
+    def __init__(self, max_entries: int = 2048) -> None:
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: List[float]) -> None:
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class CollegeQueryService:
+    """Long-lived retrieval over the procounsel_colleges collection.
+
+    The SentenceTransformer and Chroma client are loaded once. Concurrent
+    queries are collected by a background thread for up to ``max_wait_ms`` and
+    embedded with a single encode() call; query embeddings are kept in an LRU
+    cache so repeated questions skip the model entirely.
+    """
+
+    def __init__(
+        self,
+        persist_dir: str = "./chroma_db",
+        max_batch: int = 32,
+        max_wait_ms: float = 5,
+        cache_size: int = 2048,
+        normalize_embeddings: bool = False
+    ) -> None:
+        self.embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+        self.client_chroma = chromadb.PersistentClient(path=persist_dir)
+        self.collection = self.client_chroma.get_collection(COLLECTION_NAME)
+        self.normalize_embeddings = normalize_embeddings
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.cache = LRUCache(cache_size)
+
+        self.requests: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self.batcher = threading.Thread(target=self._batch_loop, name="query-embedder", daemon=True)
+        self.batcher.start()
+
+    def _batch_loop(self) -> None:
+        while True:
+            batch = [self.requests.get()]
+            # Gather whatever else arrives within the wait window, up to max_batch
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self.requests.get(timeout=self.max_wait))
+            except queue.Empty:
+                pass
+
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = self.embedding_model.encode(
+                    texts,
+                    batch_size=len(texts),
+                    normalize_embeddings=self.normalize_embeddings,
+                    convert_to_numpy=True,
+                    show_progress_bar=False
+                ).tolist()
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            by_text = dict(zip(texts, vectors))
+            for text, vector in by_text.items():
+                self.cache.put(text, vector)
+            for text, future in batch:
+                future.set_result(by_text[text])
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embedding for a query, from the LRU cache or the shared batcher"""
+        cached = self.cache.get(text)
+        if cached is not None:
+            return cached
+        future: Future = Future()
+        self.requests.put((text, future))
+        return future.result()
+
+    @staticmethod
+    def build_where(college: Optional[str] = None, category: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        filters = []
+        if college:
+            filters.append({"college": college.upper()})
+        if category:
+            filters.append({"category": category})
+        if not filters:
+            return None
+        return filters[0] if len(filters) == 1 else {"$and": filters}
+
+    def query(
+        self,
+        text: str,
+        n_results: int = 3,
+        college: Optional[str] = None,
+        category: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Top matching chunks as dicts with id, document, metadata and distance"""
+        embedding = self.embed_query(text.strip())
+        results = self.collection.query(
+            query_embeddings=[embedding],
+            n_results=n_results,
+            where=self.build_where(college, category),
+            include=["documents", "metadatas", "distances"]
+        )
+        return [
+            {"id": chunk_id, "document": document, "metadata": metadata, "distance": distance}
+            for chunk_id, document, metadata, distance in zip(
+                results["ids"][0], results["documents"][0], results["metadatas"][0], results["distances"][0]
+            )
+        ]
+
+
+def serve(service: CollegeQueryService, host: str, port: int) -> None:
+    """Expose GET /query?q=...&n=3&college=...&category=... as JSON"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            parsed = urlparse(self.path)
+            if parsed.path != "/query":
+                self.send_error(404)
+                return
+            params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+            if not params.get("q"):
+                self.send_error(400, "missing q")
+                return
+            try:
+                body = json.dumps(service.query(
+                    params["q"],
+                    n_results=int(params.get("n", 3)),
+                    college=params.get("college"),
+                    category=params.get("category")
+                ), ensure_ascii=False).encode("utf-8")
+            except Exception as e:
+                self.send_error(500, str(e))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving queries on http://{host}:{port}/query?q=...")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("query", nargs="?", help="Run a single query and exit (omit for interactive mode)")
+    parser.add_argument("--persist-dir", default="./chroma_db", help="ChromaDB storage folder")
+    parser.add_argument("-n", "--n-results", default=3, type=int, help="Chunks to return per query")
+    parser.add_argument("--college", default=None, help="Restrict results to one college ID")
+    parser.add_argument("--category", default=None, help="Restrict results to one page category")
+    parser.add_argument("--serve", action="store_true", help="Run an HTTP query server instead")
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP server host")
+    parser.add_argument("--port", default=8765, type=int, help="HTTP server port")
+    args = parser.parse_args()
+
+    service = CollegeQueryService(persist_dir=args.persist_dir)
+
+    if args.serve:
+        serve(service, args.host, args.port)
+    elif args.query:
+        for hit in service.query(args.query, args.n_results, args.college, args.category):
+            print(json.dumps(hit, ensure_ascii=False))
+    else:
+        print("Type a question (empty line to quit)")
+        while True:
+            text = input("> ").strip()
+            if not text:
+                break
+            for hit in service.query(text, args.n_results, args.college, args.category):
+                source = hit["metadata"].get("source")
+                print(f"[{hit['distance']:.3f}] {hit['metadata'].get('college')}/{source}: {hit['document'][:200]}")
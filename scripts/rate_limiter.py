@@ -0,0 +1,182 @@
+import time
+import heapq
+import random
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+# Statuses worth retrying; 429 and 503 additionally mean "slow down"
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+
+class FetchError(Exception):
+    """HTTP error response for a page, carrying the status and any Retry-After delay."""
+
+    def __init__(self, url: str, status: int, retry_after: Optional[float] = None) -> None:
+        super().__init__(f"HTTP {status} for {url}")
+        self.url = url
+        self.status = status
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, url: str, status: int, headers: Dict[str, str]) -> "FetchError":
+        return cls(url, status, parse_retry_after(headers.get("retry-after")))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (HTTP-date values are ignored)."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+def is_timeout(error: BaseException) -> bool:
+    # Playwright raises its own TimeoutError class, unrelated to the builtin one
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError)) or type(error).__name__ == "TimeoutError"
+
+
+def is_throttle(error: BaseException) -> bool:
+    """Errors that mean the host is overloaded or rate limiting us"""
+    if isinstance(error, FetchError):
+        return error.status in THROTTLE_STATUSES or error.status >= 500
+    return is_timeout(error)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Everything except definite client errors (404, 403, ...) is worth another try"""
+    if isinstance(error, FetchError):
+        return is_retryable_status(error.status)
+    return True
+
+
+def is_retryable_status(status: Optional[int]) -> bool:
+    """Same rule for a dead-letter entry; no status means a timeout or network error"""
+    return status is None or status in RETRYABLE_STATUSES
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+@dataclass
+class HostBucket:
+    rate: float
+    tokens: float
+    updated: float
+    paused_until: float = 0.0
+
+
+class AdaptiveRateLimiter:
+    """Per-host token bucket whose rate adapts to how the host responds (AIMD).
+
+    Each healthy response adds ``increase`` requests/second up to ``max_rate``;
+    a 429/5xx/timeout multiplies the rate by ``decrease`` (down to ``min_rate``)
+    and pauses the host for Retry-After, or one request interval. Shared by all
+    workers of one event loop, and by all colleges in a batch crawl.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 1.0,
+        min_rate: float = 0.1,
+        max_rate: float = 5.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        burst: float = 2.0
+    ) -> None:
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst
+        self.buckets: Dict[str, HostBucket] = {}
+
+    def bucket(self, host: str) -> HostBucket:
+        if host not in self.buckets:
+            self.buckets[host] = HostBucket(rate=self.initial_rate, tokens=1.0, updated=time.monotonic())
+        return self.buckets[host]
+
+    def rate(self, host: str) -> float:
+        return self.bucket(host).rate
+
+    async def acquire(self, host: str) -> None:
+        """Wait until the host's bucket has a token, then take it"""
+        bucket = self.bucket(host)
+        while True:
+            now = time.monotonic()
+            if now < bucket.paused_until:
+                await asyncio.sleep(bucket.paused_until - now)
+                continue
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return
+            await asyncio.sleep((1 - bucket.tokens) / bucket.rate)
+
+    def record_success(self, host: str) -> None:
+        bucket = self.bucket(host)
+        bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    def record_throttle(self, host: str, retry_after: Optional[float] = None) -> None:
+        bucket = self.bucket(host)
+        bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+        bucket.tokens = 0.0
+        pause = retry_after if retry_after is not None else 1 / bucket.rate
+        bucket.paused_until = max(bucket.paused_until, time.monotonic() + pause)
+
+
+class RetryQueue:
+    """Failed URLs waiting for another attempt, with exponential backoff and jitter.
+
+    URLs that fail ``max_retries`` more times, or fail with a non-retryable error,
+    go to ``dead_letters`` instead.
+    """
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 2.0, max_delay: float = 120.0) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.heap: List[Tuple[float, int, str, int]] = []
+        self.seq = 0
+        self.dead_letters: List[Dict[str, Any]] = []
+
+    def schedule(self, url: str, attempt: int, error: BaseException) -> Optional[float]:
+        """Queue attempt number ``attempt`` (1 = first retry). Returns the delay, or None if dead-lettered."""
+        if attempt > self.max_retries or not is_retryable(error):
+            self.dead_letters.append({
+                "url": url,
+                "attempts": attempt,
+                "status": getattr(error, "status", None),
+                "error": str(error).splitlines()[0] if str(error) else type(error).__name__,
+                "failed_at": time.strftime("%Y-%m-%d %H:%M:%S")
+            })
+            return None
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            delay = max(delay, retry_after)
+        delay *= random.uniform(0.8, 1.2)
+        self.seq += 1
+        heapq.heappush(self.heap, (time.monotonic() + delay, self.seq, url, attempt))
+        return delay
+
+    def pop_ready(self) -> Optional[Tuple[str, int]]:
+        """(url, attempt) of a retry whose backoff has elapsed, or None"""
+        if self.heap and self.heap[0][0] <= time.monotonic():
+            _, _, url, attempt = heapq.heappop(self.heap)
+            return url, attempt
+        return None
+
+    def urls(self) -> Set[str]:
+        return {url for _, _, url, _ in self.heap}
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __bool__(self) -> bool:
+        return bool(self.heap)
@@ -1,79 +1,315 @@
 import os
-import re
 import json
-from typing import Dict, Any
-from google.cloud import firestore
+import logging
+import argparse
+import threading
+from itertools import chain, islice
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, Iterator, List, Optional, Tuple, Union
+
+from crawl_archive import read_archive
+from dedup import BoilerplateFilter, SimHashIndex, simhash
+from document_sources import clean_content, normalize_document, strip_boilerplate
+from metrics import METRICS
+
+if TYPE_CHECKING:
+    from google.cloud import firestore
+
+logger = logging.getLogger(__name__)
+
+# Firestore allows at most 500 writes per batch
+MAX_BATCH_SIZE = 500
+# ...and at most 10 MiB per commit request; leave headroom for field names and encoding overhead
+MAX_BATCH_BYTES = 8 * 1024 * 1024
+# Document references per get_all() existence lookup
+LOOKUP_CHUNK_SIZE = 300
+
+# A scraped JSON file path or a record from a college's crawl archive
+Item = Union[str, Dict[str, Any]]
 
 
 class FirestoreLoader:
-    def __init__(self) -> None:
-        # Uses Application Default Credentials (ADC)
-        self.db = firestore.Client()
+    def __init__(self, db: Optional["firestore.Client"] = None) -> None:
+        if db is None:
+            from google.cloud import firestore
+            # Uses Application Default Credentials (ADC)
+            db = firestore.Client()
+        self.db = db
 
     @staticmethod
     def clean_content(text: str) -> str:
         """Clean scraped text by removing newlines, multiple spaces, and junk."""
-        if not text:
-            return ""
-        # Collapse whitespace/newlines
-        text = re.sub(r"\s+", " ", text)
-        # Example: remove ad-like patterns
-        text = re.sub(r"Get Upto.*?Explore", "", text, flags=re.IGNORECASE)
-        return text.strip()
-
-    def save_json_to_firestore(
+        return clean_content(text)
+
+    def prepare_document(
         self,
         college_name: str,
         file_name: str,
         data: Dict[str, Any]
-    ) -> None:
-        """Clean JSON and store in Firestore using filename as doc ID, skip if exists."""
-        # Ensure required fields exist
-        data["content"] = self.clean_content(data.get("content", ""))
-        data["category"] = str(data.get("category", "unknown"))
-        data["scraped_at"] = str(data.get("scraped_at", ""))
-        data["url"] = str(data.get("url", ""))
-        data["title"] = str(data.get("title", ""))
-
-        college_name = college_name.upper()
-
-        # Use filename (without extension) as Firestore doc ID
-        doc_id: str = file_name.replace(".json", "")
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """Normalize a scraped JSON and return (college doc ID, doc ID, data)."""
+        doc_id, data = normalize_document(file_name, data)
+        return college_name.upper(), doc_id, data
 
-        doc_ref = (
+    def doc_ref(self, college_name: str, doc_id: str) -> "firestore.DocumentReference":
+        return (
             self.db.collection("collegeScrape")
             .document(college_name)
             .collection("data")
             .document(doc_id)
         )
 
-        # Check if document already exists
-        if doc_ref.get().exists:
-            print(f"⏩ Skipped (already exists): {doc_id} for {college_name}")
-            return
+    def upload_batch(
+        self,
+        documents: List[Tuple[str, str, Dict[str, Any]]],
+        incremental: bool = False
+    ) -> Dict[str, int]:
+        """Upload up to MAX_BATCH_SIZE prepared (college, doc ID, data) tuples.
+
+        Existence is checked with chunked ``get_all`` calls (hash field only) and new or
+        changed docs are committed in one WriteBatch, or several when their payload would
+        exceed MAX_BATCH_BYTES. Returns written/skipped/failed counts.
+        """
+        summary = {"written": 0, "skipped": 0, "failed": 0}
+        if not documents:
+            return summary
 
-        # Save new doc
-        doc_ref.set(data)
-        print(f"Saved doc {doc_id} for {college_name}")
+        refs = [self.doc_ref(college, doc_id) for college, doc_id, _ in documents]
+        existing: Dict[str, Dict[str, Any]] = {}
+        try:
+            for i in range(0, len(refs), LOOKUP_CHUNK_SIZE):
+                with METRICS.timer("firestore_lookup"):
+                    snapshots = list(self.db.get_all(refs[i:i + LOOKUP_CHUNK_SIZE], field_paths=["content_hash"]))
+                for snapshot in snapshots:
+                    if snapshot.exists:
+                        existing[snapshot.reference.path] = snapshot.to_dict() or {}
+        except Exception as e:
+            summary["failed"] += len(documents)
+            logger.error("Error looking up %d docs: %s", len(documents), e)
+            return summary
 
-    def process_base_folder(self, base_path: str) -> None:
-        """Iterate through college folders and upload all JSON files."""
-        for college_name in os.listdir(base_path):
-            college_path = os.path.join(base_path, college_name)
-            if not os.path.isdir(college_path):
+        writes: List[Tuple[Any, Dict[str, Any]]] = []
+        for ref, (_, _, data) in zip(refs, documents):
+            stored = existing.get(ref.path)
+            if stored is not None and (not incremental or stored.get("content_hash") == data["content_hash"]):
+                summary["skipped"] += 1
                 continue
+            writes.append((ref, data))
 
-            for file_name in os.listdir(college_path):
-                if file_name.endswith(".json"):
-                    file_path = os.path.join(college_path, file_name)
-                    try:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            data: Dict[str, Any] = json.load(f)
-                            self.save_json_to_firestore(college_name, file_name, data)
-                    except Exception as e:
-                        print(f"Error processing {file_path}: {e}")
+        for group in self.commit_groups(writes):
+            batch = self.db.batch()
+            for ref, data in group:
+                batch.set(ref, data)
+            try:
+                with METRICS.timer("firestore_commit"):
+                    batch.commit()
+                summary["written"] += len(group)
+            except Exception as e:
+                summary["failed"] += len(group)
+                logger.error("Error committing batch of %d docs: %s", len(group), e)
+        for key, count in summary.items():
+            METRICS.incr(f"docs_{key}", count)
+        return summary
+
+    @staticmethod
+    def commit_groups(
+        writes: List[Tuple[Any, Dict[str, Any]]],
+        max_bytes: int = MAX_BATCH_BYTES
+    ) -> Iterator[List[Tuple[Any, Dict[str, Any]]]]:
+        """Split (ref, data) writes into groups whose estimated request size stays under max_bytes."""
+        group: List[Tuple[Any, Dict[str, Any]]] = []
+        size = 0
+        for ref, data in writes:
+            # UTF-8 JSON length is a close upper bound for string-heavy documents
+            doc_size = len(ref.path) + len(json.dumps(data, ensure_ascii=False, default=str).encode("utf-8"))
+            if group and size + doc_size > max_bytes:
+                yield group
+                group, size = [], 0
+            group.append((ref, data))
+            size += doc_size
+        if group:
+            yield group
+
+    @staticmethod
+    def load_item(item: Item) -> Tuple[str, Dict[str, Any]]:
+        """Raw (file name or doc ID, data) for a JSON file path or an archive record."""
+        if isinstance(item, dict):
+            data = dict(item)
+            data.pop("key", None)
+            return data.pop("doc_id"), data
+        with open(item, "r", encoding="utf-8") as f:
+            return os.path.basename(item), json.load(f)
+
+    def read_document(
+        self,
+        college_name: str,
+        item: Item,
+        boilerplate: Optional[BoilerplateFilter] = None
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """Load and clean one scraped JSON file or archive record (runs on the read pool).
+
+        With ``boilerplate`` the college's repeated lines are dropped before cleaning,
+        while the raw text still has its line breaks.
+        """
+        file_name, data = self.load_item(item)
+        if boilerplate is not None:
+            strip_boilerplate(data, boilerplate)
+        return self.prepare_document(college_name, file_name, data)
+
+    @staticmethod
+    def iter_college_folders(base_path: str) -> Iterator[Tuple[str, str]]:
+        """Yield (college folder name, folder path) using os.scandir."""
+        with os.scandir(base_path) as colleges:
+            for college in colleges:
+                if college.is_dir():
+                    yield college.name, college.path
+
+    @staticmethod
+    def college_items(folder: str) -> Iterator[Item]:
+        """JSON file paths in the folder, then the live records of its crawl archive
+        (--format jsonl), which are streamed rather than loaded up front."""
+        with os.scandir(folder) as entries:
+            files = sorted(
+                entry.path for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            )
+        return chain(files, read_archive(folder))
+
+    def process_base_folder(
+        self,
+        base_path: str,
+        incremental: bool = False,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_workers: int = 8,
+        read_workers: int = 8,
+        max_in_flight: int = 4,
+        dedup: bool = False
+    ) -> Dict[str, int]:
+        """Iterate through college folders and upload all JSON files and archived pages as a pipeline.
+
+        Files are read, parsed and cleaned on a thread pool one batch at a time; each
+        finished batch goes to an upload pool while the next batch is being read.
+        At most ``max_in_flight`` batches wait for Firestore at any moment, which also
+        bounds memory.
+
+        With ``dedup`` each college is read twice: a first pass learns its boilerplate
+        lines, and in the second pass those lines are stripped and pages whose SimHash
+        is within a few bits of an earlier page are not uploaded.
+        """
+        totals = {"written": 0, "skipped": 0, "failed": 0, "duplicates": 0}
+        per_college: Dict[str, Dict[str, int]] = {}
+        batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        slots = threading.BoundedSemaphore(max_in_flight)
+        uploads: List[Tuple[str, "Future[Dict[str, int]]"]] = []
+        pending = {"batches": 0}
+        pending_lock = threading.Lock()
+
+        def track_pending(delta: int) -> None:
+            with pending_lock:
+                pending["batches"] += delta
+                METRICS.gauge("upload_batches_pending", pending["batches"])
+
+        def windows(folder: str) -> Iterator[List[Item]]:
+            items = self.college_items(folder)
+            while True:
+                window = list(islice(items, batch_size))
+                if not window:
+                    return
+                yield window
+
+        def raw_content(item: Item) -> str:
+            try:
+                return str(self.load_item(item)[1].get("content", ""))
+            except Exception:
+                return ""  # Reported by the upload pass
+
+        def read_or_none(
+            college_name: str,
+            item: Item,
+            boilerplate: Optional[BoilerplateFilter]
+        ) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+            try:
+                return self.read_document(college_name, item, boilerplate)
+            except Exception as e:
+                logger.warning("Error processing %s: %s", item if isinstance(item, str) else item.get("url"), e)
+                return None
+
+        with ThreadPoolExecutor(max_workers=read_workers) as read_pool, \
+                ThreadPoolExecutor(max_workers=max_workers) as upload_pool:
+            for college_name, folder in self.iter_college_folders(base_path):
+                counts = per_college.setdefault(
+                    college_name.upper(), {"written": 0, "skipped": 0, "failed": 0, "duplicates": 0}
+                )
+                boilerplate = BoilerplateFilter() if dedup else None
+                seen = SimHashIndex() if dedup else None
+                if boilerplate is not None:
+                    for window in windows(folder):
+                        for text in read_pool.map(raw_content, window):
+                            boilerplate.observe(text)
+
+                for window in windows(folder):
+                    with METRICS.timer("read_batch"):
+                        read = read_pool.map(lambda item: read_or_none(college_name, item, boilerplate), window)
+                        documents = [doc for doc in read if doc]
+                    METRICS.incr("files_read", len(window))
+                    counts["failed"] += len(window) - len(documents)
+                    if seen is not None:
+                        unique = [doc for doc in documents if seen.add(doc[1], simhash(doc[2]["content"])) is None]
+                        counts["duplicates"] += len(documents) - len(unique)
+                        METRICS.incr("docs_duplicate", len(documents) - len(unique))
+                        documents = unique
+                    if not documents:
+                        continue
+
+                    # Block here when too many batches are already waiting on Firestore
+                    with METRICS.timer("upload_backpressure_wait"):
+                        slots.acquire()
+                    track_pending(1)
+                    future = upload_pool.submit(self.upload_batch, documents, incremental)
+                    future.add_done_callback(lambda _: (track_pending(-1), slots.release()))
+                    uploads.append((college_name.upper(), future))
+
+            for college_name, future in uploads:
+                for key, count in future.result().items():
+                    per_college[college_name][key] += count
+
+        for college_name, counts in per_college.items():
+            for key, count in counts.items():
+                totals[key] += count
+            print(f"{college_name}: {counts['written']} written, {counts['skipped']} skipped, "
+                  f"{counts['failed']} failed, {counts['duplicates']} near-duplicates")
+
+        print(f"Upload finished: {totals['written']} written, {totals['skipped']} skipped, "
+              f"{totals['failed']} failed, {totals['duplicates']} near-duplicates")
+        return totals
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", default="./scraped_data", help="Folder with one sub-folder per college")
+    parser.add_argument("--incremental", action="store_true", help="Overwrite existing docs whose content changed")
+    parser.add_argument("--batch-size", default=MAX_BATCH_SIZE, type=int, help="Writes per Firestore batch (max 500)")
+    parser.add_argument("--max-workers", default=8, type=int, help="Concurrent Firestore lookups/commits")
+    parser.add_argument("--read-workers", default=8, type=int, help="Threads reading and cleaning JSON files")
+    parser.add_argument("--max-in-flight", default=4, type=int, help="Batches waiting on Firestore before reading pauses")
+    parser.add_argument("--dedup", action="store_true", help="Strip per-college boilerplate lines and skip near-duplicate pages")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="DEBUG shows one line per document")
+    parser.add_argument("--metrics-out", default=None,
+                        help="Write run metrics to this file (Prometheus text for *.prom, JSON otherwise)")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(message)s")
+
     loader = FirestoreLoader()
-    loader.process_base_folder("./scraped_data")
+    loader.process_base_folder(
+        args.base,
+        incremental=args.incremental,
+        batch_size=args.batch_size,
+        max_workers=args.max_workers,
+        read_workers=args.read_workers,
+        max_in_flight=args.max_in_flight,
+        dedup=args.dedup
+    )
+    print(METRICS.summary())
+    if args.metrics_out:
+        METRICS.write(args.metrics_out)
 
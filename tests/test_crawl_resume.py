@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("playwright")
+
+import get_all_colleges
+from rate_limiter import FetchError
+
+BASE = "https://collegedunia.com/university/123-test-university"
+PAGES = [BASE] + [f"{BASE}/page-{i}" for i in range(1, 6)]
+MISSING = f"{BASE}/removed-page"
+
+
+class FakeContext:
+    async def new_page(self):
+        return object()
+
+    async def route(self, *args):
+        pass
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    async def new_context(self, **kwargs):
+        return FakeContext()
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """Stub site: the start page links every page plus one that returns 404."""
+    state = {"fetched": [], "broken": set()}
+
+    async def scrape_page(page, url, *args, **kwargs):
+        state["fetched"].append(url)
+        if url == MISSING:
+            raise FetchError(url, 404)
+        if url in state["broken"]:
+            raise FetchError(url, 503)
+        return (PAGES + [MISSING] if url == BASE else []), "new"
+
+    monkeypatch.setattr(get_all_colleges, "scrape_page", scrape_page)
+    return state
+
+
+def crawl(out_folder, resume, max_pages=50):
+    return asyncio.run(get_all_colleges.crawl_college(
+        FakeBrowser(), BASE, str(out_folder), max_pages=max_pages,
+        delay_min=0, delay_max=0, resume=resume, max_retries=0
+    ))
+
+
+def failed_urls(out_folder):
+    with open(out_folder / "test_university.dead_letter.json", encoding="utf-8") as f:
+        return sorted(entry["url"] for entry in json.load(f)["failed"])
+
+
+def test_resume_after_404_recrawls_the_site(tmp_path, site):
+    crawl(tmp_path, resume=False)
+    assert failed_urls(tmp_path) == [MISSING]
+
+    for _ in range(2):
+        site["fetched"].clear()
+        crawl(tmp_path, resume=True)
+        # A finished crawl starts over instead of resuming an empty queue
+        assert set(PAGES) <= set(site["fetched"])
+        assert failed_urls(tmp_path) == [MISSING]
+
+
+def test_resume_after_max_pages_recrawls_the_site(tmp_path, site):
+    assert crawl(tmp_path, resume=False, max_pages=3) == 3
+    site["fetched"].clear()
+    assert crawl(tmp_path, resume=True, max_pages=3) == 3
+    assert site["fetched"][0] == BASE
+
+
+def test_resume_retries_transient_failures(tmp_path, site):
+    site["broken"].add(PAGES[2])
+    crawl(tmp_path, resume=False)
+    assert failed_urls(tmp_path) == sorted([MISSING, PAGES[2]])
+
+    site["broken"].clear()
+    site["fetched"].clear()
+    crawl(tmp_path, resume=True)
+    assert PAGES[2] in site["fetched"]
+    assert failed_urls(tmp_path) == [MISSING]